@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select
 from datetime import datetime
 from app.core.database import get_db
 from app.models import Application, Resume, JobDescription
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset, page
 
 router = APIRouter()
 
@@ -48,42 +49,76 @@ async def create_application(payload: ApplicationCreate, db: AsyncSession = Depe
 
 
 @router.get("/")
-async def get_all_applications(db: AsyncSession = Depends(get_db)):
-    """Get all applications with resume and job info"""
-
-    result = await db.execute(
+async def get_all_applications(
+    cursor: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_body: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get applications with resume and job info, most recently updated first.
+
+    notes and contact_info are only included with include_body; pass the
+    returned next_cursor back as cursor for the following page.
+    """
+
+    cols = [
+        Application.id,
+        Application.status,
+        Application.resume_id,
+        Application.jd_id,
+        Application.applied_date,
+        Application.interview_date,
+        Application.follow_up_date,
+        Application.created_at,
+        Application.updated_at,
+    ]
+    if include_body:
+        cols += [Application.notes, Application.contact_info]
+
+    query = (
         select(
-            Application,
+            *cols,
             Resume.filename,
             JobDescription.title,
             JobDescription.company
         )
         .join(Resume, Resume.id == Application.resume_id)
         .join(JobDescription, JobDescription.id == Application.jd_id)
-        .order_by(desc(Application.updated_at))
     )
 
+    try:
+        query = keyset(
+            query, Application.updated_at, Application.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = await db.execute(query)
+    rows, next_cursor = page(
+        result.fetchall(), limit, lambda row: (row.updated_at, row.id))
+
     apps = []
-    for row in result.fetchall():
-        apps.append({
-            "id": row.Application.id,
-            "status": row.Application.status,
-            "resume": {"id": row.Application.resume_id, "filename": row.filename},
+    for row in rows:
+        item = {
+            "id": row.id,
+            "status": row.status,
+            "resume": {"id": row.resume_id, "filename": row.filename},
             "job": {
-                "id": row.Application.jd_id,
+                "id": row.jd_id,
                 "title": row.title,
                 "company": row.company
             },
-            "applied_date": row.Application.applied_date.isoformat() if row.Application.applied_date else None,
-            "interview_date": row.Application.interview_date.isoformat() if row.Application.interview_date else None,
-            "follow_up_date": row.Application.follow_up_date.isoformat() if row.Application.follow_up_date else None,
-            "notes": row.Application.notes,
-            "contact_info": row.Application.contact_info,
-            "created_at": row.Application.created_at.isoformat(),
-            "updated_at": row.Application.updated_at.isoformat()
-        })
-
-    return {"applications": apps}
+            "applied_date": row.applied_date.isoformat() if row.applied_date else None,
+            "interview_date": row.interview_date.isoformat() if row.interview_date else None,
+            "follow_up_date": row.follow_up_date.isoformat() if row.follow_up_date else None,
+            "created_at": row.created_at.isoformat(),
+            "updated_at": row.updated_at.isoformat()
+        }
+        if include_body:
+            item["notes"] = row.notes
+            item["contact_info"] = row.contact_info
+        apps.append(item)
+
+    return {"applications": apps, "next_cursor": next_cursor}
 
 
 @router.get("/{app_id}")
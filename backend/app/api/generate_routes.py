@@ -1,18 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+import asyncio
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from app.core.config import get_settings
+from app.core.database import session_factory
 from app.models import GeneratedContent
-from app.services.generation_service import analyze_match, write_cover_letter, prep_interview
+from app.services.generation_service import (
+    prepare_match, prepare_cover_letter, prepare_interview,
+    run_match, run_cover_letter, run_interview,
+    stream_text, parse_json_result,
+    match_key, cover_letter_key, interview_key, get_cached_result, cache_result,
+    MATCH_TEMP, COVER_LETTER_TEMP, INTERVIEW_TEMP,
+)
 from app.services.resume_service import get_resume
 from app.services.jd_service import get_jd
+from app.services.retrieval_service import rank_jds_for_resume, rank_resumes_for_jd
+from app.utils.sse import sse_event, SSE_HEADERS
 
+cfg = get_settings()
 router = APIRouter()
 
 
 class MatchRequest(BaseModel):
     resume_id: str
     jd_id: str
+    # skip the result cache (when enabled) and regenerate
+    force_refresh: bool = False
 
 
 class CoverRequest(BaseModel):
@@ -20,12 +34,30 @@ class CoverRequest(BaseModel):
     jd_id: str
     company_name: str = ""
     job_title: str = ""
+    force_refresh: bool = False
 
 
 class InterviewRequest(BaseModel):
     resume_id: str
     jd_id: str
     company_name: str = ""
+    force_refresh: bool = False
+
+
+class RankJobsRequest(BaseModel):
+    resume_id: str
+    # rank these jds only; default is every stored jd
+    jd_ids: list[str] | None = None
+    limit: int = Field(50, ge=1, le=cfg.rank_limit_max)
+    # run the full llm match analysis on this many of the best-ranked jds
+    analyze_top: int = 0
+
+
+class RankResumesRequest(BaseModel):
+    jd_id: str
+    resume_ids: list[str] | None = None
+    limit: int = Field(50, ge=1, le=cfg.rank_limit_max)
+    analyze_top: int = 0
 
 
 async def _get_resume_and_jd(db: AsyncSession, resume_id: str, jd_id: str):
@@ -50,12 +82,99 @@ async def _get_resume_and_jd(db: AsyncSession, resume_id: str, jd_id: str):
     return resume, jd
 
 
-@router.post("/match")
-async def match(payload: MatchRequest, db: AsyncSession = Depends(get_db)):
-    resume, jd = await _get_resume_and_jd(db, payload.resume_id, payload.jd_id)
+def _match_key(resume, jd, payload: MatchRequest) -> str:
+    return match_key(resume.raw_text, jd.raw_text)
+
+
+def _cover_key(resume, jd, payload: CoverRequest) -> str:
+    return cover_letter_key(
+        resume.raw_text, jd.raw_text, payload.company_name, payload.job_title)
+
+
+def _interview_key(resume, jd, payload: InterviewRequest) -> str:
+    return interview_key(resume.raw_text, jd.raw_text, payload.company_name)
+
+
+def _match_prompt(db: AsyncSession, jd, payload: MatchRequest):
+    return prepare_match(db, payload.resume_id, jd.raw_text, jd_id=jd.id)
+
+
+def _cover_prompt(db: AsyncSession, jd, payload: CoverRequest):
+    return prepare_cover_letter(
+        db,
+        payload.resume_id,
+        jd.raw_text,
+        payload.company_name,
+        payload.job_title,
+        jd_id=jd.id
+    )
+
+
+def _interview_prompt(db: AsyncSession, jd, payload: InterviewRequest):
+    return prepare_interview(
+        db,
+        payload.resume_id,
+        jd.raw_text,
+        payload.company_name,
+        jd_id=jd.id
+    )
+
+
+async def _prepare(payload, make_key, make_prompt):
+    """db phase before generation: validate the pair, check the result cache
+    and build the prompt from retrieved context.
+
+    returns (cache_key, cached_result, prompt), with exactly one of the last
+    two set. the session is closed on return, so its pooled connection is
+    back in the pool before the llm call starts.
+    """
+    async with session_factory() as db:
+        resume, jd = await _get_resume_and_jd(db, payload.resume_id, payload.jd_id)
+        key = make_key(resume, jd, payload)
+        hit = None if payload.force_refresh else get_cached_result(key)
+        if hit is not None:
+            return key, hit, None
+        prompt = await make_prompt(db, jd, payload)
+    return key, None, prompt
+
+
+async def _generate(payload, make_key, make_prompt, run) -> tuple:
+    """fetch context, release the db, call the llm. the result is cached but
+    not persisted, that's a separate short session (_save_content).
 
+    returns (result, cached): a cache hit was already saved to history when
+    it was generated, so callers only persist fresh results.
+    """
+    key, hit, prompt = await _prepare(payload, make_key, make_prompt)
+    if hit is not None:
+        return hit, True
+    result = await run(prompt)
+    cache_result(key, result)
+    return result, False
+
+
+async def _save_content(resume_id: str, jd_id: str, kind: str, body: str, meta: dict):
     try:
-        result = await analyze_match(db, payload.resume_id, jd.raw_text)
+        async with session_factory() as db:
+            db.add(GeneratedContent(
+                resume_id=resume_id,
+                jd_id=jd_id,
+                kind=kind,
+                body=body,
+                meta=meta
+            ))
+            await db.commit()
+    except Exception as e:
+        print(f"Failed to save {kind}: {e}")
+        # Don't fail the request just because saving failed
+
+
+@router.post("/match")
+async def match(payload: MatchRequest):
+    try:
+        result, cached = await _generate(payload, _match_key, _match_prompt, run_match)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Match analysis failed: {e}")
         raise HTTPException(
@@ -67,35 +186,18 @@ async def match(payload: MatchRequest, db: AsyncSession = Depends(get_db)):
         raise HTTPException(
             status_code=500, detail="Match analysis returned no result")
 
-    try:
-        content = GeneratedContent(
-            resume_id=payload.resume_id,
-            jd_id=payload.jd_id,
-            kind="match",
-            body=str(result),
-            meta=result
-        )
-        db.add(content)
-        await db.commit()
-    except Exception as e:
-        print(f"Failed to save match result: {e}")
-        # Don't fail the request just because saving failed
+    if not cached:
+        await _save_content(payload.resume_id, payload.jd_id, "match", str(result), result)
 
     return result
 
 
 @router.post("/cover-letter")
-async def cover_letter(payload: CoverRequest, db: AsyncSession = Depends(get_db)):
-    resume, jd = await _get_resume_and_jd(db, payload.resume_id, payload.jd_id)
-
+async def cover_letter(payload: CoverRequest):
     try:
-        letter = await write_cover_letter(
-            db,
-            payload.resume_id,
-            jd.raw_text,
-            payload.company_name,
-            payload.job_title
-        )
+        letter, cached = await _generate(payload, _cover_key, _cover_prompt, run_cover_letter)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Cover letter generation failed: {e}")
         raise HTTPException(
@@ -107,33 +209,21 @@ async def cover_letter(payload: CoverRequest, db: AsyncSession = Depends(get_db)
         raise HTTPException(
             status_code=500, detail="Cover letter generation returned empty content")
 
-    try:
-        content = GeneratedContent(
-            resume_id=payload.resume_id,
-            jd_id=payload.jd_id,
-            kind="cover_letter",
-            body=letter,
-            meta={"company": payload.company_name, "title": payload.job_title}
-        )
-        db.add(content)
-        await db.commit()
-    except Exception as e:
-        print(f"Failed to save cover letter: {e}")
+    if not cached:
+        await _save_content(
+            payload.resume_id, payload.jd_id, "cover_letter", letter,
+            {"company": payload.company_name, "title": payload.job_title})
 
     return {"cover_letter": letter}
 
 
 @router.post("/interview-prep")
-async def interview(payload: InterviewRequest, db: AsyncSession = Depends(get_db)):
-    resume, jd = await _get_resume_and_jd(db, payload.resume_id, payload.jd_id)
-
+async def interview(payload: InterviewRequest):
     try:
-        questions = await prep_interview(
-            db,
-            payload.resume_id,
-            jd.raw_text,
-            payload.company_name
-        )
+        questions, cached = await _generate(
+            payload, _interview_key, _interview_prompt, run_interview)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Interview prep failed: {e}")
         raise HTTPException(
@@ -145,17 +235,175 @@ async def interview(payload: InterviewRequest, db: AsyncSession = Depends(get_db
         raise HTTPException(
             status_code=500, detail="Interview prep returned no questions")
 
+    if not cached:
+        await _save_content(
+            payload.resume_id, payload.jd_id, "interview", str(questions),
+            {"questions": questions})
+
+    return {"questions": questions}
+
+
+def _sse_response(prompt: str, temp: float, finish):
+    """stream llm tokens as sse, then hand the full text to `finish`.
+
+    finish(text) parses/persists the result and returns the payload for the
+    closing `done` event. no db session is held while tokens stream; finish
+    opens its own to persist.
+    """
+
+    async def events():
+        parts = []
+        try:
+            async for delta in stream_text(prompt, temp):
+                parts.append(delta)
+                yield sse_event("token", {"text": delta})
+        except Exception as e:
+            print(f"Streaming generation failed: {e}")
+            yield sse_event("error", {
+                "detail": "AI generation failed. This may be a quota issue — please try again shortly."})
+            return
+
+        try:
+            result = await finish("".join(parts).strip())
+        except Exception as e:
+            print(f"Failed to finish streamed result: {e}")
+            yield sse_event("error", {"detail": "AI returned an unreadable result"})
+            return
+
+        yield sse_event("done", result)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def _prepare_stream(payload, make_key, make_prompt, what: str, detail: str):
+    """_prepare for the stream routes, failing the way the non-stream routes
+    do: a retrieval or embedding error is a 503, not a bare 500"""
     try:
-        content = GeneratedContent(
-            resume_id=payload.resume_id,
-            jd_id=payload.jd_id,
-            kind="interview",
-            body=str(questions),
-            meta={"questions": questions}
-        )
-        db.add(content)
-        await db.commit()
+        return await _prepare(payload, make_key, make_prompt)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Failed to save interview prep: {e}")
+        print(f"{what} failed: {e}")
+        raise HTTPException(status_code=503, detail=detail)
 
-    return {"questions": questions}
+
+def _sse_cached(result) -> StreamingResponse:
+    """cache hit: nothing to stream, send the final event straight away"""
+
+    async def events():
+        yield sse_event("done", result)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/match/stream")
+async def match_stream(payload: MatchRequest):
+    key, hit, prompt = await _prepare_stream(
+        payload, _match_key, _match_prompt, "Match analysis",
+        "AI analysis failed. This may be a quota issue — please try again shortly.")
+    if hit is not None:
+        return _sse_cached(hit)
+
+    async def finish(text: str) -> dict:
+        result = parse_json_result(text)
+        cache_result(key, result)
+        await _save_content(payload.resume_id, payload.jd_id, "match", str(result), result)
+        return result
+
+    return _sse_response(prompt, MATCH_TEMP, finish)
+
+
+@router.post("/cover-letter/stream")
+async def cover_letter_stream(payload: CoverRequest):
+    key, hit, prompt = await _prepare_stream(
+        payload, _cover_key, _cover_prompt, "Cover letter generation",
+        "AI generation failed. This may be a quota issue — please try again shortly.")
+    if hit is not None:
+        return _sse_cached({"cover_letter": hit})
+
+    async def finish(text: str) -> dict:
+        cache_result(key, text)
+        await _save_content(
+            payload.resume_id, payload.jd_id, "cover_letter", text,
+            {"company": payload.company_name, "title": payload.job_title})
+        return {"cover_letter": text}
+
+    return _sse_response(prompt, COVER_LETTER_TEMP, finish)
+
+
+@router.post("/interview-prep/stream")
+async def interview_stream(payload: InterviewRequest):
+    key, hit, prompt = await _prepare_stream(
+        payload, _interview_key, _interview_prompt, "Interview prep",
+        "AI generation failed. This may be a quota issue — please try again shortly.")
+    if hit is not None:
+        return _sse_cached({"questions": hit})
+
+    async def finish(text: str) -> dict:
+        questions = parse_json_result(text)
+        cache_result(key, questions)
+        await _save_content(
+            payload.resume_id, payload.jd_id, "interview", str(questions),
+            {"questions": questions})
+        return {"questions": questions}
+
+    return _sse_response(prompt, INTERVIEW_TEMP, finish)
+
+
+async def _analyze_pair(resume_id: str, jd_id: str) -> dict | None:
+    """full match analysis with its own short db phases, so many can run concurrently"""
+    payload = MatchRequest(resume_id=resume_id, jd_id=jd_id)
+    try:
+        result, cached = await _generate(payload, _match_key, _match_prompt, run_match)
+    except Exception as e:
+        print(f"Ranked match analysis failed for {resume_id}/{jd_id}: {e}")
+        return None
+
+    if not cached:
+        await _save_content(resume_id, jd_id, "match", str(result), result)
+    return result
+
+
+async def _analyze_top(ranked: list[dict], analyze_top: int, pair) -> list[dict]:
+    top = ranked[:max(0, min(analyze_top, cfg.rank_analyze_max))]
+    results = await asyncio.gather(*(_analyze_pair(*pair(r)) for r in top))
+    for r, analysis in zip(top, results):
+        r["analysis"] = analysis
+    return ranked
+
+
+@router.post("/rank")
+async def rank_jobs(payload: RankJobsRequest):
+    """Rank many jds for one resume by embedding similarity, optionally analyzing the top few"""
+    async with session_factory() as db:
+        if not await get_resume(db, payload.resume_id):
+            raise HTTPException(status_code=404, detail="Resume not found")
+
+        ranked = await rank_jds_for_resume(
+            db, payload.resume_id, payload.jd_ids, payload.limit)
+
+    ranked = await _analyze_top(
+        ranked, payload.analyze_top,
+        lambda r: (payload.resume_id, r["jd_id"]))
+
+    return {"resume_id": payload.resume_id, "results": ranked}
+
+
+@router.post("/rank-resumes")
+async def rank_resumes(payload: RankResumesRequest):
+    """Rank many resumes for one jd by embedding similarity, optionally analyzing the top few"""
+    async with session_factory() as db:
+        if not await get_jd(db, payload.jd_id):
+            raise HTTPException(
+                status_code=404, detail="Job description not found")
+
+        ranked = await rank_resumes_for_jd(
+            db, payload.jd_id, payload.resume_ids, payload.limit)
+
+    ranked = await _analyze_top(
+        ranked, payload.analyze_top,
+        lambda r: (r["resume_id"], payload.jd_id))
+
+    return {"jd_id": payload.jd_id, "results": ranked}
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select
 from app.core.database import get_db
 from app.models import GeneratedContent, Resume, JobDescription
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset, page
 
 router = APIRouter()
 
@@ -10,13 +11,29 @@ router = APIRouter()
 @router.get("/")
 async def get_all_history(
     content_type: str = None,
-    limit: int = 50,
+    cursor: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_body: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get history of all generated content"""
+    """Get history of all generated content, newest first.
+
+    content and metadata are only included with include_body; pass the
+    returned next_cursor back as cursor for the following page.
+    """
+
+    cols = [
+        GeneratedContent.id,
+        GeneratedContent.kind,
+        GeneratedContent.resume_id,
+        GeneratedContent.jd_id,
+        GeneratedContent.created_at,
+    ]
+    if include_body:
+        cols += [GeneratedContent.body, GeneratedContent.meta]
 
     query = select(
-        GeneratedContent,
+        *cols,
         Resume.filename.label('resume_name'),
         JobDescription.title.label('job_title'),
         JobDescription.company
@@ -24,37 +41,43 @@ async def get_all_history(
         Resume, Resume.id == GeneratedContent.resume_id
     ).join(
         JobDescription, JobDescription.id == GeneratedContent.jd_id
-    ).order_by(desc(GeneratedContent.created_at))
+    )
 
     if content_type:
         query = query.where(GeneratedContent.kind == content_type)
 
-    query = query.limit(limit)
+    try:
+        query = keyset(
+            query, GeneratedContent.created_at, GeneratedContent.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     result = await db.execute(query)
-    rows = result.fetchall()
-
-    return {
-        "items": [
-            {
-                "id": row.GeneratedContent.id,
-                "type": row.GeneratedContent.kind,
-                "content": row.GeneratedContent.body,
-                "metadata": row.GeneratedContent.meta,
-                "resume": {
-                    "id": row.GeneratedContent.resume_id,
-                    "filename": row.resume_name
-                },
-                "job": {
-                    "id": row.GeneratedContent.jd_id,
-                    "title": row.job_title,
-                    "company": row.company
-                },
-                "created_at": row.GeneratedContent.created_at.isoformat()
-            }
-            for row in rows
-        ]
-    }
+    rows, next_cursor = page(
+        result.fetchall(), limit, lambda row: (row.created_at, row.id))
+
+    items = []
+    for row in rows:
+        item = {
+            "id": row.id,
+            "type": row.kind,
+            "resume": {
+                "id": row.resume_id,
+                "filename": row.resume_name
+            },
+            "job": {
+                "id": row.jd_id,
+                "title": row.job_title,
+                "company": row.company
+            },
+            "created_at": row.created_at.isoformat()
+        }
+        if include_body:
+            item["content"] = row.body
+            item["metadata"] = row.meta
+        items.append(item)
+
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/{content_id}")
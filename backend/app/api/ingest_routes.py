@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.services.ingest_service import get_job, get_jobs, job_status
+
+router = APIRouter()
+
+
+@router.get("/")
+async def statuses(ids: list[str] = Query(...), db: AsyncSession = Depends(get_db)):
+    """Status of several ingest jobs at once (?ids=a&ids=b)"""
+    jobs = await get_jobs(db, ids)
+    return {"jobs": [job_status(j) for j in jobs]}
+
+
+@router.get("/{job_id}")
+async def status(job_id: str, db: AsyncSession = Depends(get_db)):
+    job = await get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return job_status(job)
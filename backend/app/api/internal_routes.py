@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from app.core.database import pool_stats, pool_status
+
+router = APIRouter()
+
+
+@router.get("/db-pool")
+async def db_pool():
+    """connection pool utilisation and checkout wait times"""
+    return pool_status()
+
+
+@router.post("/db-pool/reset")
+async def reset_db_pool_stats():
+    """zero the wait counters, e.g. before a load test"""
+    pool_stats.reset()
+    return pool_status()
@@ -1,15 +1,14 @@
 import json
 import re
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from google import genai
 from app.core.database import get_db
-from app.core.config import get_settings
+from app.core.llm import complete
 from app.services.jd_service import process_jd, get_jd, get_all_jds
-
-cfg = get_settings()
-gemini_client = genai.Client(api_key=cfg.gemini_key)
+from app.services.ingest_service import enqueue_jd
+from app.services.vector_store import invalidate_jd
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
 
 router = APIRouter()
 
@@ -21,8 +20,17 @@ class JDRequest(BaseModel):
     url: str = None
 
 
+class BulkJDRequest(BaseModel):
+    jobs: list[JDRequest]
+
+
 @router.post("/")
-async def create(payload: JDRequest, db: AsyncSession = Depends(get_db)):
+async def create(payload: JDRequest, background: bool = False, db: AsyncSession = Depends(get_db)):
+    if background:
+        job = await enqueue_jd(
+            db, payload.title, payload.raw_text, payload.company, payload.url)
+        return {"job_id": job.id, "status": job.status}
+
     jd = await process_jd(
         db,
         payload.title,
@@ -39,19 +47,47 @@ async def create(payload: JDRequest, db: AsyncSession = Depends(get_db)):
     }
 
 
+@router.post("/bulk")
+async def create_bulk(payload: BulkJDRequest, db: AsyncSession = Depends(get_db)):
+    """Queue many job descriptions for background ingestion; poll /api/ingest/{job_id}"""
+    jobs = []
+    for j in payload.jobs:
+        job = await enqueue_jd(db, j.title, j.raw_text, j.company, j.url)
+        jobs.append({"title": j.title, "job_id": job.id, "status": job.status})
+    return {"jobs": jobs}
+
+
 @router.get("/")
-async def list_all(db: AsyncSession = Depends(get_db)):
-    jds = await get_all_jds(db)
-    return [
-        {
+async def list_all(
+    response: Response,
+    cursor: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_body: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Newest-first page of jds; the next page's cursor comes back in X-Next-Cursor"""
+    try:
+        jds, next_cursor = await get_all_jds(db, cursor, limit, include_body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    items = []
+    for j in jds:
+        item = {
             "id": j.id,
             "title": j.title,
             "company": j.company,
             "url": j.url,
             "created_at": j.created_at.isoformat(),
         }
-        for j in jds
-    ]
+        if include_body:
+            item["raw_text"] = j.raw_text
+        items.append(item)
+
+    return items
 
 
 @router.get("/{jid}")
@@ -78,12 +114,13 @@ async def delete_job(jid: str, db: AsyncSession = Depends(get_db)):
 
     await db.delete(jd)
     await db.commit()
+    invalidate_jd(jid)
     return {"deleted": True}
 
 
 @router.post("/extract")
 async def extract_job_info(payload: dict):
-    """Use Gemini to extract job title, company, and URL from raw text"""
+    """Use the configured LLM to extract job title, company, and URL from raw text"""
     raw_text = payload.get("raw_text", "")
 
     if not raw_text:
@@ -119,7 +156,7 @@ async def extract_job_info(payload: dict):
                 regex_company = candidate
                 break
 
-    # Layer 2: Gemini extraction with improved prompt
+    # Layer 2: LLM extraction with improved prompt
     prompt = f"""Extract structured information from this job posting. Be precise.
 
 JOB POSTING:
@@ -135,26 +172,21 @@ Return ONLY valid JSON with these exact keys:
 No markdown. No explanation. Raw JSON only."""
 
     try:
-        resp = gemini_client.models.generate_content(
-            model="gemini-2.0-flash-exp",
-            contents=prompt,
-            config={"temperature": 0},
-        )
-        result = resp.text.strip()
+        result = await complete(prompt, temp=0)
         cleaned = result.replace("```json", "").replace("```", "").strip()
         data = json.loads(cleaned)
 
-        gemini_title = data.get("title", "").strip()
-        gemini_company = data.get("company", "").strip()
-        gemini_confidence = data.get("confidence", "low")
+        llm_title = data.get("title", "").strip()
+        llm_company = data.get("company", "").strip()
+        llm_confidence = data.get("confidence", "low")
 
-        # Layer 3: Merge — prefer Gemini when confident, regex as fallback
-        final_company = gemini_company
-        if not final_company or gemini_confidence == "low":
-            final_company = regex_company or gemini_company
+        # Layer 3: Merge — prefer the LLM when confident, regex as fallback
+        final_company = llm_company
+        if not final_company or llm_confidence == "low":
+            final_company = regex_company or llm_company
 
         return {
-            "title": gemini_title,
+            "title": llm_title,
             "company": final_company,
             "url": extracted_url
         }
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
 from app.core.database import get_db
-from app.services.resume_service import process_resume, get_resume, get_all
-
+from app.core.errors import ResumeVersionConflictError, WorkerPoolError
+from app.services.resume_service import process_resume, get_resume, get_all, delete_resume as remove_resume
+from app.services.resume_versions import get_versions
+from app.services.ingest_service import enqueue_resume
+from app.services.vector_store import invalidate_resume
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+
+cfg = get_settings()
 router = APIRouter()
 
 
-@router.post("/upload")
-async def upload(file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
+async def _read_pdf_upload(file: UploadFile) -> bytes:
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file provided")
 
@@ -23,13 +29,33 @@ async def upload(file: UploadFile = File(...), db: AsyncSession = Depends(get_db
     if len(raw) == 0:
         raise HTTPException(status_code=400, detail="Uploaded file is empty")
 
-    if len(raw) > 10 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File too large, 10MB max")
+    if len(raw) > cfg.pdf_max_mb * 1024 * 1024:
+        raise HTTPException(
+            status_code=400, detail=f"File too large, {cfg.pdf_max_mb}MB max")
+
+    return raw
+
+
+@router.post("/upload")
+async def upload(
+    file: UploadFile = File(...),
+    background: bool = False,
+    family_id: str = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Store a resume. Pass the family_id of an earlier upload to store it as a new version"""
+    raw = await _read_pdf_upload(file)
+
+    if background:
+        job = await enqueue_resume(db, file.filename, raw, family_id)
+        return {"job_id": job.id, "status": job.status}
 
     try:
-        res = await process_resume(db, file.filename, raw)
+        res = await process_resume(db, file.filename, raw, family_id)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
+    except (ResumeVersionConflictError, WorkerPoolError) as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
         print(f"Resume processing failed: {e}")
         raise HTTPException(
@@ -44,28 +70,68 @@ async def upload(file: UploadFile = File(...), db: AsyncSession = Depends(get_db
         "filename": res.filename,
         "sections": list(res.parsed_data.keys()) if res.parsed_data else [],
         "text_preview": res.raw_text[:500] if res.raw_text else "",
+        "family_id": res.family_id,
+        "version": res.version,
         "created_at": res.created_at.isoformat(),
     }
 
 
+@router.post("/bulk")
+async def upload_bulk(files: list[UploadFile] = File(...), db: AsyncSession = Depends(get_db)):
+    """Queue many resumes for background ingestion; poll /api/ingest/{job_id}"""
+    jobs = []
+    for f in files:
+        try:
+            raw = await _read_pdf_upload(f)
+        except HTTPException as e:
+            jobs.append({"filename": f.filename, "status": "rejected", "error": e.detail})
+            continue
+        job = await enqueue_resume(db, f.filename, raw)
+        jobs.append({"filename": f.filename, "job_id": job.id, "status": job.status})
+
+    return {"jobs": jobs}
+
+
 @router.get("/")
-async def list_all(db: AsyncSession = Depends(get_db)):
+async def list_all(
+    response: Response,
+    cursor: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_body: bool = False,
+    all_versions: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Newest-first page of resumes (latest versions unless all_versions);
+    the next page's cursor comes back in X-Next-Cursor"""
     try:
-        resumes = await get_all(db)
+        resumes, next_cursor = await get_all(
+            db, cursor, limit, include_body, all_versions)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Failed to fetch resumes: {e}")
         raise HTTPException(
             status_code=500, detail="Failed to retrieve resumes")
 
-    return [
-        {
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    items = []
+    for r in resumes:
+        item = {
             "id": r.id,
             "filename": r.filename,
             "sections": list(r.parsed_data.keys()) if r.parsed_data else [],
+            "family_id": r.family_id,
+            "version": r.version,
             "created_at": r.created_at.isoformat(),
         }
-        for r in resumes
-    ]
+        if include_body:
+            item["raw_text"] = r.raw_text
+            item["parsed_data"] = r.parsed_data
+        items.append(item)
+
+    return items
 
 
 @router.get("/{rid}")
@@ -88,10 +154,32 @@ async def detail(rid: str, db: AsyncSession = Depends(get_db)):
         "filename": res.filename,
         "raw_text": res.raw_text,
         "parsed_data": res.parsed_data,
+        "family_id": res.family_id,
+        "version": res.version,
+        "parent_id": res.parent_id,
         "created_at": res.created_at.isoformat(),
     }
 
 
+@router.get("/{rid}/versions")
+async def versions(rid: str, db: AsyncSession = Depends(get_db)):
+    """Every version of the resume rid belongs to, newest first"""
+    res = await get_resume(db, rid)
+    if not res:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    return [
+        {
+            "id": v.id,
+            "filename": v.filename,
+            "version": v.version,
+            "parent_id": v.parent_id,
+            "created_at": v.created_at.isoformat(),
+        }
+        for v in await get_versions(db, res.family_id)
+    ]
+
+
 @router.delete("/{rid}")
 async def delete_resume(rid: str, db: AsyncSession = Depends(get_db)):
     if not rid or not rid.strip():
@@ -108,8 +196,8 @@ async def delete_resume(rid: str, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Resume not found")
 
     try:
-        await db.delete(res)
-        await db.commit()
+        await remove_resume(db, res)
+        invalidate_resume(rid)
     except Exception as e:
         await db.rollback()
         print(f"Failed to delete resume {rid}: {e}")
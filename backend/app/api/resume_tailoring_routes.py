@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
-from app.services.resume_tailoring_service import generate_resume_suggestions, build_tailored_resume
+from app.core.database import session_factory
+from app.core.errors import RenderTimeoutError, WorkerPoolError
+from app.services.resume_tailoring_service import (
+    suggestions_for, iter_section_suggestions, build_tailored_resume, render_pdf)
 from app.services.resume_service import get_resume
-from app.services.jd_service import get_jd
-from fastapi.responses import Response
-from app.utils.pdf_generator import generate_resume_pdf
+from app.services.jd_service import get_jd, get_jds
+from fastapi.responses import Response, StreamingResponse
+from app.core.config import get_settings
+from app.utils.sse import sse_event, SSE_HEADERS
+from app.utils.zip_stream import stream_zip
+
+cfg = get_settings()
 
 router = APIRouter()
 
@@ -24,30 +29,74 @@ class FinalizeRequest(BaseModel):
     last_name: str
 
 
+class BulkFinalizeRequest(BaseModel):
+    resume_id: str
+    jd_ids: list[str]
+    first_name: str
+    last_name: str
+    # approved sections per jd id; a jd without an entry gets the original resume
+    approved_sections: dict[str, dict] = {}
+
+
+async def _load_pair(resume_id: str, jd_id: str):
+    """fetch resume + jd in a short session of their own.
+
+    the llm calls that follow don't need the db, so the pooled connection is
+    returned before they start instead of being held for the whole request.
+    """
+    async with session_factory() as db:
+        resume = await get_resume(db, resume_id)
+        jd = await get_jd(db, jd_id)
+
+    if not resume or not jd:
+        raise HTTPException(status_code=404, detail="Resume or JD not found")
+
+    return resume, jd
+
+
 @router.post("/suggest")
-async def suggest_improvements(payload: TailorRequest, db: AsyncSession = Depends(get_db)):
+async def suggest_improvements(payload: TailorRequest):
     """Generate tailoring suggestions for resume"""
 
+    resume, jd = await _load_pair(payload.resume_id, payload.jd_id)
+
     try:
-        suggestions = await generate_resume_suggestions(
-            db,
-            payload.resume_id,
-            payload.jd_id
-        )
+        suggestions = await suggestions_for(resume, jd)
         return suggestions
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/suggest/stream")
+async def suggest_improvements_stream(payload: TailorRequest):
+    """Same as /suggest, but sends each section as a server-sent event when it's ready"""
+
+    resume, jd = await _load_pair(payload.resume_id, payload.jd_id)
+
+    parsed = resume.parsed_data or {}
+    meta = {
+        "resume_id": payload.resume_id,
+        "jd_id": payload.jd_id,
+        "job_title": jd.title,
+        "company": jd.company,
+    }
+    jd_text = jd.raw_text
+
+    async def events():
+        yield sse_event("meta", meta)
+        async for section, suggestion in iter_section_suggestions(parsed, jd_text):
+            yield sse_event("section", {"section": section, "suggestion": suggestion})
+        yield sse_event("done", {})
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.post("/finalize")
-async def finalize_resume(payload: FinalizeRequest, db: AsyncSession = Depends(get_db)):
+async def finalize_resume(payload: FinalizeRequest):
     """Build final tailored resume and return as PDF download"""
 
-    resume = await get_resume(db, payload.resume_id)
-    jd = await get_jd(db, payload.jd_id)
-
-    if not resume or not jd:
-        raise HTTPException(status_code=404, detail="Resume or JD not found")
+    resume, jd = await _load_pair(payload.resume_id, payload.jd_id)
 
     resume_text, filename = build_tailored_resume(
         resume.parsed_data,
@@ -57,7 +106,12 @@ async def finalize_resume(payload: FinalizeRequest, db: AsyncSession = Depends(g
         jd.company or "Company"
     )
 
-    pdf_bytes = generate_resume_pdf(resume_text, filename)
+    try:
+        pdf_bytes = await render_pdf(resume_text, filename)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except (RenderTimeoutError, WorkerPoolError) as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
 
     return Response(
         content=pdf_bytes,
@@ -66,3 +120,61 @@ async def finalize_resume(payload: FinalizeRequest, db: AsyncSession = Depends(g
             "Content-Disposition": f"attachment; filename={filename}"
         }
     )
+
+
+@router.post("/finalize/zip")
+async def finalize_resumes_zip(payload: BulkFinalizeRequest):
+    """Tailored resume PDFs for many JDs, streamed as one ZIP download"""
+
+    jd_ids = list(dict.fromkeys(payload.jd_ids))
+    if not jd_ids:
+        raise HTTPException(status_code=400, detail="No job descriptions given")
+    if len(jd_ids) > cfg.tailor_zip_max_jds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {cfg.tailor_zip_max_jds} job descriptions per export")
+
+    async with session_factory() as db:
+        resume = await get_resume(db, payload.resume_id)
+        jds = await get_jds(db, jd_ids)
+
+    missing = [j for j in jd_ids if j not in jds]
+    if not resume or missing:
+        raise HTTPException(status_code=404, detail="Resume or JD not found")
+
+    parsed = resume.parsed_data or {}
+    companies = {j: jds[j].company or "Company" for j in jd_ids}
+
+    async def files():
+        used, failed = set(), []
+        for jid in jd_ids:
+            resume_data, filename = build_tailored_resume(
+                parsed,
+                payload.approved_sections.get(jid, {}),
+                payload.first_name,
+                payload.last_name,
+                companies[jid],
+            )
+            # two jds at the same company would share a filename
+            name, n = filename, 1
+            while name in used:
+                n += 1
+                name = filename.replace(".pdf", f"_{n}.pdf")
+            used.add(name)
+
+            try:
+                yield name, await render_pdf(resume_data, name)
+            except Exception as e:
+                # headers are already sent, so note the failure in the archive
+                print(f"Bulk export render failed for jd {jid}: {e}")
+                failed.append(f"{jid} ({companies[jid]}): {e}")
+
+        if failed:
+            yield "errors.txt", ("\n".join(failed) + "\n").encode("utf-8")
+
+    fname = f"{payload.first_name}_{payload.last_name}_Resumes.zip"
+    return StreamingResponse(
+        stream_zip(files()),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={fname}"},
+    )
@@ -1,10 +1,120 @@
+import os
+import threading
+import time
+from sqlalchemy import event, exc, make_url, text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import get_settings
+from app.core.vectors import (
+    ensure_embedding_columns, ensure_vector_indexes, session_settings,
+    parse_version, iterative_scan_enabled, PGVECTOR_VERSION_SQL)
 
 cfg = get_settings()
 
-engine = create_async_engine(cfg.db_url, echo=cfg.app_env == "development")
+
+class PoolStats:
+    """checkout wait times and timeouts, shared by every pool the engine builds"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total_s = 0.0
+            self.wait_max_s = 0.0
+            # checkouts that had to wait for a connection to be returned
+            self.waited = 0
+
+    def record(self, wait_s: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total_s += wait_s
+            self.wait_max_s = max(self.wait_max_s, wait_s)
+            if wait_s >= 0.01:
+                self.waited += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "waited": self.waited,
+                "wait_avg_ms": round(1000 * self.wait_total_s / attempts, 3) if attempts else 0.0,
+                "wait_max_ms": round(1000 * self.wait_max_s, 3),
+            }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """queue pool that times how long each checkout waits for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record(time.perf_counter() - start)
+        return conn
+
+
+def _engine_url():
+    url = make_url(cfg.db_url)
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() == "asyncpg":
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(cfg.db_statement_cache_size)})
+    return url
+
+
+engine = create_async_engine(
+    _engine_url(),
+    echo=cfg.db_echo,
+    poolclass=InstrumentedPool,
+    pool_size=cfg.db_pool_size,
+    max_overflow=cfg.db_max_overflow,
+    pool_timeout=cfg.db_pool_timeout_s,
+    pool_recycle=cfg.db_pool_recycle_s,
+    pool_pre_ping=cfg.db_pool_pre_ping,
+)
+
+
+def pool_status() -> dict:
+    """current utilisation of the engine's pool plus checkout wait stats"""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "max_overflow": cfg.db_max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # negative until the pool has opened pool_size connections
+        "overflow": pool.overflow(),
+        "timeout_s": cfg.db_pool_timeout_s,
+        **pool_stats.snapshot(),
+    }
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _apply_session_settings(dbapi_conn, _record):
+    # ann search knobs live for the whole pooled connection
+    cur = dbapi_conn.cursor()
+    cur.execute(PGVECTOR_VERSION_SQL)
+    row = cur.fetchone()
+    for stmt in session_settings(parse_version(row[0] if row else None)):
+        cur.execute(stmt)
+    cur.close()
+
+
 session_factory = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -21,11 +131,31 @@ async def get_db() -> AsyncSession:
             await sesh.close()
 
 
+ALEMBIC_INI = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "alembic.ini")
+
+
+def _upgrade_schema(sync_conn):
+    from alembic import command
+    from alembic.config import Config
+
+    acfg = Config(ALEMBIC_INI)
+    # env.py runs on this connection instead of opening its own
+    acfg.attributes["connection"] = sync_conn
+    command.upgrade(acfg, "head")
+
+
 async def init_db():
     async with engine.begin() as conn:
-        # pgvector needs this extension
-        await conn.execute(
-            __import__("sqlalchemy").text(
-                "CREATE EXTENSION IF NOT EXISTS vector")
-        )
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_upgrade_schema)
+        await ensure_embedding_columns(conn)
+        await ensure_vector_indexes(conn)
+
+        # this connection may predate the vector extension on a fresh database
+        version = parse_version(await conn.scalar(text(PGVECTOR_VERSION_SQL)))
+        for stmt in session_settings(version):
+            await conn.execute(text(stmt))
+        if cfg.vector_iterative_scan and not iterative_scan_enabled(version):
+            print(f"vector_iterative_scan={cfg.vector_iterative_scan} needs pgvector "
+                  f">= 0.8, running without it; filtered ann queries may return "
+                  f"fewer than k rows")
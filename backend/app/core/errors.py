@@ -1,8 +1,22 @@
+import sys
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import SQLAlchemyError
-from google.genai.errors import ClientError as GeminiError
-from openai import APIError as OpenAIError
+
+# (module, class) of provider sdk errors. looked up lazily: if the sdk was
+# never imported, the exception can't have come from it
+PROVIDER_ERRORS = [
+    ("google.genai.errors", "ClientError"),
+    ("openai", "APIError"),
+]
+
+
+def is_provider_error(exc: Exception) -> bool:
+    for mod_name, cls_name in PROVIDER_ERRORS:
+        mod = sys.modules.get(mod_name)
+        if mod is not None and isinstance(exc, getattr(mod, cls_name)):
+            return True
+    return False
 
 
 class JobwiseException(Exception):
@@ -35,6 +49,27 @@ class GenerationError(JobwiseException):
         super().__init__(f"Failed to generate content using {provider}", 500)
 
 
+class ResumeVersionConflictError(JobwiseException):
+    """another upload took the same version number of the family first"""
+
+    def __init__(self):
+        super().__init__("Resume was updated by another upload, please try again", 409)
+
+
+class WorkerPoolError(JobwiseException):
+    """a process pool worker died and the retry on a fresh one died too"""
+
+    def __init__(self):
+        super().__init__("Worker process unavailable, please try again", 503)
+
+
+class RenderTimeoutError(JobwiseException):
+    """a pdf render ran past pdf_render_timeout_s and its worker was killed"""
+
+    def __init__(self):
+        super().__init__("PDF took too long to render", 504)
+
+
 async def jobwise_exception_handler(request: Request, exc: JobwiseException):
     return JSONResponse(
         status_code=exc.status_code,
@@ -53,7 +88,7 @@ async def ai_api_exception_handler(request: Request, exc: Exception):
     """Handle OpenAI and Gemini API errors"""
     error_msg = "AI service error"
 
-    if isinstance(exc, (GeminiError, OpenAIError)):
+    if is_provider_error(exc):
         if "quota" in str(exc).lower() or "429" in str(exc):
             error_msg = "API quota exceeded. Please try again later or check your API key."
         elif "401" in str(exc) or "invalid" in str(exc).lower():
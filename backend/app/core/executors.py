@@ -0,0 +1,112 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from app.core.errors import WorkerPoolError
+
+
+def _noop():
+    return None
+
+
+class _SlotPool:
+    """`workers` single-process executors, each running one job at a time.
+
+    a job holds its slot (and so its process) from start to finish: its
+    timeout only counts time actually running, not time queued behind other
+    jobs, and a job that overruns can be killed without taking down work
+    running in the other slots.
+    """
+
+    def __init__(self, workers: int):
+        n = max(1, workers)
+        self._slots: list[ProcessPoolExecutor | None] = [None] * n
+        self._free: asyncio.Queue = asyncio.Queue()
+        for i in range(n):
+            self._free.put_nowait(i)
+
+    async def _executor(self, i: int) -> ProcessPoolExecutor:
+        if self._slots[i] is None:
+            # spawn, not fork: forking a process with a running event loop and
+            # open db/http connections is asking for trouble
+            pool = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            # start the process before the job's clock does
+            try:
+                await asyncio.wrap_future(pool.submit(_noop))
+            except BaseException:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            self._slots[i] = pool
+        return self._slots[i]
+
+    def _release(self, loop, i: int):
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(self._free.put_nowait, i)
+
+    def _kill(self, i: int):
+        """drop a slot's process; the next job in the slot gets a fresh one"""
+        pool, self._slots[i] = self._slots[i], None
+        if pool is None:
+            return
+        for proc in list(getattr(pool, "_processes", {}).values()):
+            proc.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn, args, timeout: float = None):
+        loop = asyncio.get_running_loop()
+        i = await self._free.get()
+        release = True
+        cfut = None
+        try:
+            # a dead worker (oom kill, crash) gets one retry on a fresh process
+            for attempt in range(2):
+                try:
+                    cfut = (await self._executor(i)).submit(fn, *args)
+                    return await asyncio.wait_for(asyncio.wrap_future(cfut), timeout)
+                except asyncio.TimeoutError:
+                    self._kill(i)
+                    raise
+                except BrokenProcessPool:
+                    self._kill(i)
+                    if attempt:
+                        raise WorkerPoolError()
+        except asyncio.CancelledError:
+            # the caller went away mid-job: keep the slot busy until the job
+            # ends so the next one doesn't queue inside the executor
+            if cfut is not None and not cfut.done():
+                release = False
+                cfut.add_done_callback(lambda _: self._release(loop, i))
+            raise
+        finally:
+            if release:
+                self._free.put_nowait(i)
+
+    def shutdown(self):
+        for pool in self._slots:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._slots = [None] * len(self._slots)
+
+
+# named pools for cpu-bound work that would otherwise hold the event loop
+_pools: dict[str, _SlotPool] = {}
+
+
+async def run_in_process(name: str, workers: int, fn, *args, timeout: float = None):
+    """run fn(*args) in the named pool; fn and args must be picklable.
+
+    raises asyncio.TimeoutError if the job runs longer than timeout (its
+    process is killed) and WorkerPoolError if the worker process keeps dying.
+    """
+    pool = _pools.get(name)
+    if pool is None:
+        pool = _pools[name] = _SlotPool(workers)
+    return await pool.run(fn, args, timeout)
+
+
+def shutdown_executors():
+    for name in list(_pools):
+        _pools.pop(name).shutdown()
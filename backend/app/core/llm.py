@@ -0,0 +1,232 @@
+import abc
+import asyncio
+import random
+import httpx
+from app.core.config import get_settings
+
+cfg = get_settings()
+
+# statuses worth another attempt: rate limited or a transient server error
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    # openai errors carry .status_code, google.genai errors carry .code
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if status in RETRY_STATUSES:
+        return True
+    return type(exc).__name__ in ("APITimeoutError", "APIConnectionError")
+
+
+def _backoff(attempt: int) -> float:
+    """full jitter: uniform over [0, min(cap, base * 2^attempt)]"""
+    ceiling = min(cfg.llm_backoff_max_s, cfg.llm_backoff_base_s * 2 ** attempt)
+    return random.uniform(0, ceiling)
+
+
+class LLMClient(abc.ABC):
+    """one provider sdk client on a shared pooled http client.
+
+    completions and embeddings each get their own concurrency cap so bursty
+    uploads can't starve generation (and vice versa). every call is retried
+    with jittered exponential backoff on 429s and transient failures.
+    """
+
+    provider: str = ""
+
+    def __init__(self, http: httpx.AsyncClient):
+        self.http = http
+        self._gen_sem = asyncio.Semaphore(max(1, cfg.llm_concurrency))
+        self._embed_sem = asyncio.Semaphore(max(1, cfg.embed_concurrency))
+
+    async def _call(self, sem: asyncio.Semaphore, fn, *args, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                async with sem:
+                    return await fn(*args, **kwargs)
+            except Exception as e:
+                if attempt >= cfg.llm_max_retries or not _is_retryable(e):
+                    raise
+                delay = _backoff(attempt)
+                print(f"{self.provider} call failed ({e.__class__.__name__}), "
+                      f"retry {attempt + 1}/{cfg.llm_max_retries} in {delay:.1f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def complete(self, prompt: str, temp: float = 0.5) -> str:
+        return await self._call(self._gen_sem, self._complete, prompt, temp)
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        return await self._call(self._embed_sem, self._embed, texts)
+
+    async def stream(self, prompt: str, temp: float = 0.5):
+        """yield text deltas as they arrive.
+
+        holds a generation slot for the whole stream. only opening the stream
+        is retried; once tokens have been sent a failure is raised as-is.
+        """
+        async with self._gen_sem:
+            attempt = 0
+            while True:
+                try:
+                    it = await self._open_stream(prompt, temp)
+                    break
+                except Exception as e:
+                    if attempt >= cfg.llm_max_retries or not _is_retryable(e):
+                        raise
+                    attempt += 1
+                    await asyncio.sleep(_backoff(attempt - 1))
+
+            async for delta in it:
+                if delta:
+                    yield delta
+
+    # what each provider implements; LLMClient wraps them in limits and retries
+
+    @abc.abstractmethod
+    async def _complete(self, prompt: str, temp: float) -> str:
+        ...
+
+    @abc.abstractmethod
+    async def _open_stream(self, prompt: str, temp: float):
+        """an async iterator of text deltas"""
+
+    @abc.abstractmethod
+    async def _embed(self, texts: list[str]) -> list[list[float]]:
+        ...
+
+
+class OpenAIClient(LLMClient):
+    provider = "openai"
+
+    def __init__(self, http: httpx.AsyncClient):
+        super().__init__(http)
+        from openai import AsyncOpenAI
+
+        # retries are handled in LLMClient._call
+        self.sdk = AsyncOpenAI(
+            api_key=cfg.openai_key, http_client=http, max_retries=0)
+
+    async def _complete(self, prompt: str, temp: float) -> str:
+        resp = await self.sdk.chat.completions.create(
+            model=cfg.openai_llm,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temp,
+        )
+        return resp.choices[0].message.content.strip()
+
+    async def _open_stream(self, prompt: str, temp: float):
+        resp = await self.sdk.chat.completions.create(
+            model=cfg.openai_llm,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temp,
+            stream=True,
+        )
+
+        async def deltas():
+            async for chunk in resp:
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content
+        return deltas()
+
+    async def _embed(self, texts: list[str]) -> list[list[float]]:
+        kwargs = {}
+        if cfg.embed_truncate_dims:
+            # text-embedding-3-* only
+            kwargs["dimensions"] = cfg.embed_dims
+        resp = await self.sdk.embeddings.create(
+            model=cfg.openai_embed_model,
+            input=texts,
+            **kwargs,
+        )
+        return [item.embedding for item in resp.data]
+
+
+class GeminiClient(LLMClient):
+    provider = "gemini"
+
+    def __init__(self, http: httpx.AsyncClient):
+        super().__init__(http)
+        from google import genai
+        from google.genai import types
+
+        self.sdk = genai.Client(
+            api_key=cfg.gemini_key,
+            http_options=types.HttpOptions(
+                timeout=int(cfg.llm_timeout_s * 1000),
+                httpx_async_client=http,
+            ),
+        )
+
+    async def _complete(self, prompt: str, temp: float) -> str:
+        resp = await self.sdk.aio.models.generate_content(
+            model=cfg.gemini_llm,
+            contents=prompt,
+            config={"temperature": temp},
+        )
+        return resp.text.strip()
+
+    async def _open_stream(self, prompt: str, temp: float):
+        resp = await self.sdk.aio.models.generate_content_stream(
+            model=cfg.gemini_llm,
+            contents=prompt,
+            config={"temperature": temp},
+        )
+
+        async def deltas():
+            async for chunk in resp:
+                yield chunk.text
+        return deltas()
+
+    async def _embed(self, texts: list[str]) -> list[list[float]]:
+        # gemini accepts a list of contents in a single batch request
+        config = {}
+        if cfg.embed_truncate_dims:
+            config["output_dimensionality"] = cfg.embed_dims
+        resp = await self.sdk.aio.models.embed_content(
+            model=cfg.gemini_embed_model,
+            contents=texts,
+            config=config or None,
+        )
+        return [e.values for e in resp.embeddings]
+
+
+_PROVIDERS = {
+    "openai": OpenAIClient,
+    "gemini": GeminiClient,
+}
+
+_client: LLMClient | None = None
+
+
+def get_llm() -> LLMClient:
+    """process-wide client for cfg.ai_provider, built on first use"""
+    global _client
+    if _client is None:
+        if cfg.ai_provider not in _PROVIDERS:
+            raise ValueError(f"Unknown ai_provider: {cfg.ai_provider}")
+        http = httpx.AsyncClient(
+            timeout=httpx.Timeout(cfg.llm_timeout_s,
+                                  connect=cfg.llm_connect_timeout_s),
+            limits=httpx.Limits(
+                max_connections=cfg.llm_max_connections,
+                max_keepalive_connections=cfg.llm_max_keepalive,
+                keepalive_expiry=cfg.llm_keepalive_s,
+            ),
+        )
+        _client = _PROVIDERS[cfg.ai_provider](http)
+    return _client
+
+
+async def complete(prompt: str, temp: float = 0.5) -> str:
+    return await get_llm().complete(prompt, temp)
+
+
+async def close_llm():
+    global _client
+    if _client is not None:
+        await _client.http.aclose()
+        _client = None
@@ -0,0 +1,249 @@
+import re
+from sqlalchemy import cast, text
+from sqlalchemy.sql.elements import ClauseElement
+from pgvector.sqlalchemy import HALFVEC, Vector
+from app.core.config import get_settings
+
+cfg = get_settings()
+
+# pgvector can only index plain `vector` columns up to 2000 dims,
+# `halfvec` expressions go up to 4000 (enough for 3072-dim gemini)
+VECTOR_INDEX_MAX_DIMS = 2000
+HALFVEC_INDEX_MAX_DIMS = 4000
+
+# ivfflat centroids come from a k-means over the rows present at build time,
+# so the index is only built once there's enough data for its lists
+# (pgvector's guidance is lists = rows / 1000)
+IVFFLAT_ROWS_PER_LIST = 1000
+
+# iterative index scans (hnsw/ivfflat.iterative_scan) arrived in pgvector 0.8
+ITERATIVE_SCAN_MIN_VERSION = (0, 8)
+# halfvec, subvector() and l2_normalize() in 0.7
+HALFVEC_MIN_VERSION = (0, 7)
+
+# (table, fk column) pairs that hold chunk embeddings
+CHUNK_TABLES = [
+    ("resume_chunks", "resume_id"),
+    ("jd_chunks", "jd_id"),
+]
+
+
+def stores_halfvec() -> bool:
+    """chunk embeddings are stored as float16 halfvec rather than float32 vector"""
+    return cfg.embed_storage == "halfvec"
+
+
+def embedding_type():
+    """column type for chunk embeddings under the configured storage and dims"""
+    if stores_halfvec():
+        return HALFVEC(cfg.embed_dims)
+    return Vector(cfg.embed_dims)
+
+
+def uses_halfvec() -> bool:
+    """a float32 column too wide to index directly, so the index is on a halfvec cast"""
+    return (not stores_halfvec() and cfg.vector_index != "none"
+            and cfg.embed_dims > VECTOR_INDEX_MAX_DIMS)
+
+
+def index_expr(col):
+    """the expression the ann index is built on; queries must order by the same one"""
+    if uses_halfvec():
+        return cast(col, HALFVEC(cfg.embed_dims))
+    return col
+
+
+def cosine_distance(col, qvec):
+    """cosine distance against `col` written so postgres can use the ann index"""
+    if uses_halfvec():
+        # sql expressions need the same cast; plain values bind as halfvec
+        other = cast(qvec, HALFVEC(cfg.embed_dims)) if isinstance(
+            qvec, ClauseElement) else qvec
+        return index_expr(col).cosine_distance(other)
+    return col.cosine_distance(qvec)
+
+
+def _ann_index_name(table: str) -> str:
+    return f"ix_{table}_embedding_{cfg.vector_index}_{cfg.embed_dims}"
+
+
+def _ann_index_sql(table: str) -> str | None:
+    kind = cfg.vector_index
+    if kind not in ("hnsw", "ivfflat"):
+        return None
+
+    dims = cfg.embed_dims
+    if dims > HALFVEC_INDEX_MAX_DIMS:
+        print(f"Skipping {kind} index on {table}: {dims} dims is above "
+              f"pgvector's {HALFVEC_INDEX_MAX_DIMS}-dim limit")
+        return None
+
+    if stores_halfvec():
+        target, ops = "embedding", "halfvec_cosine_ops"
+    elif uses_halfvec():
+        target, ops = f"(embedding::halfvec({dims}))", "halfvec_cosine_ops"
+    else:
+        target, ops = "embedding", "vector_cosine_ops"
+
+    if kind == "hnsw":
+        params = f"m = {cfg.hnsw_m}, ef_construction = {cfg.hnsw_ef_construction}"
+    else:
+        params = f"lists = {cfg.ivfflat_lists}"
+
+    return (f"CREATE INDEX IF NOT EXISTS {_ann_index_name(table)} ON {table} "
+            f"USING {kind} ({target} {ops}) WITH ({params})")
+
+
+def _fts_index_sql(table: str) -> str:
+    # same expression as retrieval_service.fts_document, or the planner skips it
+    return (f"CREATE INDEX IF NOT EXISTS ix_{table}_content_fts ON {table} "
+            f"USING gin (to_tsvector('{cfg.fts_config}'::regconfig, content))")
+
+
+def _column_type_sql() -> str:
+    return f"{'halfvec' if stores_halfvec() else 'vector'}({cfg.embed_dims})"
+
+
+EMBEDDING_TYPE_SQL = (
+    "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+    "WHERE attrelid = CAST(:t AS regclass) AND attname = 'embedding'"
+)
+EMBEDDING_INDEXES_SQL = (
+    "SELECT indexname FROM pg_indexes WHERE tablename = :t AND indexname LIKE :p"
+)
+
+
+def embedding_column_ddl(
+    table: str, have: str | None, indexes: list[str], pgvector_version: tuple | None,
+) -> list[str]:
+    """statements taking `table`.embedding from type `have` to the configured
+    storage and dims; [] when it's already there.
+
+    narrowing is done in place: matryoshka-trained models (text-embedding-3-*,
+    gemini-embedding-001) truncate to a prefix, so existing vectors are cut
+    with subvector() and renormalized, matching what the provider returns for
+    the smaller size. widening would need a re-embed and is refused.
+    `indexes` are the table's ann indexes (EMBEDDING_INDEXES_SQL), dropped
+    since they're on the old type; ensure_vector_indexes rebuilds them.
+    """
+    want = _column_type_sql()
+    if not have or have == want:
+        return []
+
+    m = re.match(r"(\w+)\((\d+)\)", have)
+    have_dims = int(m.group(2)) if m else None
+    if have_dims is None or have_dims < cfg.embed_dims:
+        raise RuntimeError(
+            f"{table}.embedding is {have}, settings want {want}: growing "
+            f"dimensions needs the chunks re-embedded, not a column change")
+
+    if pgvector_version is None or pgvector_version < HALFVEC_MIN_VERSION:
+        raise RuntimeError(
+            f"{table}.embedding is {have}, settings want {want}: converting "
+            f"needs pgvector >= 0.7 (found {pgvector_version})")
+
+    if have_dims == cfg.embed_dims:
+        using = f"embedding::{want}"
+    else:
+        using = (f"l2_normalize(subvector(embedding::vector({have_dims}), 1, "
+                 f"{cfg.embed_dims}))::{want}")
+
+    print(f"Converting {table}.embedding from {have} to {want}")
+    return [f"DROP INDEX IF EXISTS {name}" for name in indexes] + [
+        f"ALTER TABLE {table} ALTER COLUMN embedding TYPE {want} USING {using}"]
+
+
+async def ensure_embedding_columns(conn):
+    """bring chunk embedding columns in line with embed_storage / embed_dims
+    (see embedding_column_ddl). runs on every boot, after migrations"""
+    version = parse_version(await conn.scalar(text(PGVECTOR_VERSION_SQL)))
+    for table, _ in CHUNK_TABLES:
+        have = await conn.scalar(text(EMBEDDING_TYPE_SQL), {"t": table})
+        indexes = await conn.execute(
+            text(EMBEDDING_INDEXES_SQL), {"t": table, "p": f"ix_{table}_embedding_%"})
+        names = [n for (n,) in indexes.fetchall()]
+        for stmt in embedding_column_ddl(table, have, names, version):
+            await conn.execute(text(stmt))
+
+
+async def _index_exists(conn, name: str) -> bool:
+    return bool(await conn.scalar(
+        text("SELECT 1 FROM pg_indexes WHERE indexname = :n"), {"n": name}))
+
+
+async def ensure_vector_indexes(conn, force: bool = False):
+    """create full-text and ann indexes for the chunk tables, safe to run on every boot.
+
+    these depend on settings (fts_config, vector_index, embedding dims), so
+    they're kept out of the alembic migrations which own everything else.
+    an ivfflat index is left out until the table holds enough rows to train
+    it (or force is set); scripts/build_vector_index creates / rebuilds it
+    after a bulk load.
+    """
+    for table, _ in CHUNK_TABLES:
+        await conn.execute(text(_fts_index_sql(table)))
+        ddl = _ann_index_sql(table)
+        if not ddl:
+            continue
+        if cfg.vector_index == "ivfflat" and not force \
+                and not await _index_exists(conn, _ann_index_name(table)):
+            rows = await conn.scalar(text(f"SELECT count(*) FROM {table}"))
+            need = cfg.ivfflat_lists * IVFFLAT_ROWS_PER_LIST
+            if rows < need:
+                print(f"Skipping ivfflat index on {table}: {rows} rows, "
+                      f"{need} needed for {cfg.ivfflat_lists} lists")
+                continue
+        await conn.execute(text(ddl))
+
+
+def is_managed_index(name: str | None) -> bool:
+    """an index ensure_vector_indexes owns rather than the migrations
+    (ix_<table>_embedding_* / ix_<table>_content_fts)"""
+    return bool(name) and name.startswith("ix_") and (
+        "_embedding_" in name or name.endswith("_content_fts"))
+
+
+async def rebuild_vector_indexes(conn):
+    """reindex the ann indexes, e.g. to retrain ivfflat centroids on current data"""
+    for table, _ in CHUNK_TABLES:
+        name = _ann_index_name(table)
+        if await _index_exists(conn, name):
+            print(f"Rebuilding {name}")
+            await conn.execute(text(f"REINDEX INDEX {name}"))
+
+
+def parse_version(v: str | None) -> tuple[int, ...] | None:
+    if not v:
+        return None
+    return tuple(int(p) for p in re.findall(r"\d+", v)[:3])
+
+
+def iterative_scan_enabled(pgvector_version: tuple | None) -> bool:
+    return bool(cfg.vector_iterative_scan) and pgvector_version is not None \
+        and pgvector_version >= ITERATIVE_SCAN_MIN_VERSION
+
+
+def session_settings(pgvector_version: tuple | None) -> list[str]:
+    """per-connection search knobs for the ann indexes.
+
+    pgvector reserves the hnsw./ivfflat. prefixes, so setting a knob the
+    installed version doesn't know is an error; the caller passes the
+    extension version of the connection (None when it isn't installed).
+    """
+    if pgvector_version is None:
+        return []
+    stmts = [
+        f"SET hnsw.ef_search = {int(cfg.hnsw_ef_search)}",
+        f"SET ivfflat.probes = {int(cfg.ivfflat_probes)}",
+    ]
+    if iterative_scan_enabled(pgvector_version):
+        # filtered queries (where resume_id = ...) keep scanning the index
+        # until enough rows survive instead of returning fewer than k.
+        # ivfflat only has relaxed_order
+        stmts.append(
+            f"SET hnsw.iterative_scan = {cfg.vector_iterative_scan}")
+        stmts.append("SET ivfflat.iterative_scan = relaxed_order")
+    return stmts
+
+
+PGVECTOR_VERSION_SQL = "SELECT extversion FROM pg_extension WHERE extname = 'vector'"
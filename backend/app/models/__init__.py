@@ -1,9 +1,10 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Text, DateTime, Float, ForeignKey, Integer, JSON
+from sqlalchemy import String, Text, DateTime, Float, ForeignKey, Index, Integer, JSON, LargeBinary
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from pgvector.sqlalchemy import Vector
 from app.core.database import Base
+from app.core.vectors import embedding_type
 from app.core.config import get_settings
 
 cfg = get_settings()
@@ -11,17 +12,24 @@ cfg = get_settings()
 __all__ = [
     "Resume",
     "ResumeChunk",
+    "ResumeChunkLink",
     "JobDescription",
     "JDChunk",
     "MatchAnalysis",
     "GeneratedContent",
     "ActivityLog",
     "Application",
+    "EmbeddingCache",
+    "IngestJob",
 ]
 
 
 class Resume(Base):
     __tablename__ = "resumes"
+    __table_args__ = (
+        Index("ix_resumes_created_at", "created_at", "id"),
+        Index("ix_resumes_family_version", "family_id", "version", unique=True),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -29,16 +37,27 @@ class Resume(Base):
     filename: Mapped[str] = mapped_column(String(255))
     raw_text: Mapped[str] = mapped_column(Text)
     parsed_data: Mapped[dict] = mapped_column(JSON, nullable=True)
+    # re-uploads of one resume share a family_id (the first version's id)
+    family_id: Mapped[str] = mapped_column(String(36))
+    version: Mapped[int] = mapped_column(Integer, default=1)
+    parent_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("resumes.id", ondelete="SET NULL"), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow)
 
+    # chunk rows this version owns; other versions may link to them too
+    # (see ResumeChunkLink), deletes are left to the database cascade
     chunks: Mapped[list["ResumeChunk"]] = relationship(
-        back_populates="resume", cascade="all, delete-orphan"
+        back_populates="resume", cascade="all, delete-orphan", passive_deletes=True
     )
 
 
 class ResumeChunk(Base):
     __tablename__ = "resume_chunks"
+    __table_args__ = (
+        Index("ix_resume_chunks_resume_id", "resume_id"),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -49,13 +68,39 @@ class ResumeChunk(Base):
     content: Mapped[str] = mapped_column(Text)
     idx: Mapped[int] = mapped_column(Integer)
     section: Mapped[str] = mapped_column(String(100), nullable=True)
-    embedding = mapped_column(Vector(cfg.embed_dims))
+    # sha256 of section + content, what re-uploads are diffed on
+    content_hash: Mapped[str] = mapped_column(String(64))
+    embedding = mapped_column(embedding_type())
 
     resume: Mapped["Resume"] = relationship(back_populates="chunks")
 
 
+class ResumeChunkLink(Base):
+    """the chunks that make up one resume version, in order.
+
+    unchanged chunks are shared between versions, so this (not
+    ResumeChunk.resume_id, which is the owning version) says which chunks
+    belong to a resume, and idx is the chunk's position in that version.
+    """
+    __tablename__ = "resume_chunk_links"
+    __table_args__ = (
+        Index("ix_resume_chunk_links_chunk_id", "chunk_id"),
+    )
+
+    resume_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True
+    )
+    idx: Mapped[int] = mapped_column(Integer, primary_key=True)
+    chunk_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("resume_chunks.id", ondelete="CASCADE")
+    )
+
+
 class JobDescription(Base):
     __tablename__ = "job_descriptions"
+    __table_args__ = (
+        Index("ix_job_descriptions_created_at", "created_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -79,6 +124,9 @@ class JobDescription(Base):
 
 class JDChunk(Base):
     __tablename__ = "jd_chunks"
+    __table_args__ = (
+        Index("ix_jd_chunks_jd_id", "jd_id"),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -88,13 +136,17 @@ class JDChunk(Base):
     )
     content: Mapped[str] = mapped_column(Text)
     idx: Mapped[int] = mapped_column(Integer)
-    embedding = mapped_column(Vector(cfg.embed_dims))
+    embedding = mapped_column(embedding_type())
 
     jd: Mapped["JobDescription"] = relationship(back_populates="chunks")
 
 
 class MatchAnalysis(Base):
     __tablename__ = "match_analyses"
+    __table_args__ = (
+        Index("ix_match_analyses_resume_id", "resume_id"),
+        Index("ix_match_analyses_jd_id", "jd_id"),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -117,6 +169,14 @@ class MatchAnalysis(Base):
 
 class GeneratedContent(Base):
     __tablename__ = "generated_content"
+    __table_args__ = (
+        # newest-first history, unfiltered and by kind
+        Index("ix_generated_content_created_at", "created_at", "id"),
+        Index("ix_generated_content_kind_created_at", "kind", "created_at", "id"),
+        # past results for a resume/jd pair; also covers resume_id cascades
+        Index("ix_generated_content_pair", "resume_id", "jd_id", "kind", "created_at"),
+        Index("ix_generated_content_jd_id", "jd_id"),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -136,6 +196,9 @@ class GeneratedContent(Base):
 
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
+    __table_args__ = (
+        Index("ix_activity_logs_created_at", "created_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -150,6 +213,11 @@ class ActivityLog(Base):
 
 class Application(Base):
     __tablename__ = "applications"
+    __table_args__ = (
+        Index("ix_applications_updated_at", "updated_at", "id"),
+        Index("ix_applications_resume_id", "resume_id"),
+        Index("ix_applications_jd_id", "jd_id"),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -172,3 +240,43 @@ class Application(Base):
         DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class EmbeddingCache(Base):
+    __tablename__ = "embedding_cache"
+
+    # sha256 of provider, model, dims and the embedded text
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    provider: Mapped[str] = mapped_column(String(20))
+    model: Mapped[str] = mapped_column(String(100))
+    dims: Mapped[int] = mapped_column(Integer)
+    # untyped width so entries from any provider/model fit in one table
+    embedding = mapped_column(Vector())
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow)
+
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+    __table_args__ = (
+        # workers pick the oldest pending job; the sweeper looks for stale running ones
+        Index("ix_ingest_jobs_status_created_at", "status", "created_at"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    # resume or jd
+    kind: Mapped[str] = mapped_column(String(20))
+    # pending, running, done, failed
+    status: Mapped[str] = mapped_column(String(20), default="pending")
+    # filename for resumes, title/raw_text/company/url for jds
+    payload: Mapped[dict] = mapped_column(JSON, nullable=True)
+    # uploaded pdf bytes, cleared once the job finishes
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
+    result_id: Mapped[str] = mapped_column(String(36), nullable=True)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,113 @@
+import struct
+import uuid
+from pgvector.sqlalchemy import HALFVEC, Vector as VectorType
+from pgvector.utils import HalfVector, Vector
+from sqlalchemy import Integer, String, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+
+cfg = get_settings()
+
+# rows per insert statement; asyncpg allows at most 32767 bind params each
+VALUES_BATCH = 1000
+
+# rows per COPY data message
+COPY_BATCH = 500
+
+_PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_PGCOPY_TRAILER = struct.pack("!h", -1)
+_NULL = struct.pack("!i", -1)
+
+
+def _binary_encoder(col):
+    """value -> postgres binary wire format for the column types chunk tables use"""
+    t = col.type
+    if isinstance(t, VectorType):
+        return Vector._to_db_binary
+    if isinstance(t, HALFVEC):
+        return HalfVector._to_db_binary
+    if isinstance(t, Integer):
+        return lambda v: struct.pack("!i", v)
+    if isinstance(t, String):
+        return lambda v: v.encode("utf-8")
+    raise TypeError(f"no binary copy encoding for {col.name} ({t})")
+
+
+def _with_ids(rows: list[dict]) -> list[dict]:
+    return [{"id": str(uuid.uuid4()), **r} for r in rows]
+
+
+async def _insert_orm(db: AsyncSession, model, rows: list[dict]):
+    db.add_all(model(**r) for r in rows)
+    await db.flush()
+
+
+async def _insert_values(db: AsyncSession, model, rows: list[dict]):
+    table = model.__table__
+    for i in range(0, len(rows), VALUES_BATCH):
+        await db.execute(insert(table).values(rows[i:i + VALUES_BATCH]))
+
+
+def _copy_stream(table, cols: list[str], rows: list[dict]):
+    """binary COPY payload for rows, encoded here rather than through
+    asyncpg's codecs: the pooled connection's codec registry is left alone
+    (it has no binary codec for vector, and sqlalchemy binds vectors as text)"""
+    encoders = [_binary_encoder(table.c[c]) for c in cols]
+    field_count = struct.pack("!h", len(cols))
+
+    async def stream():
+        buf = bytearray(_PGCOPY_HEADER)
+        for n, r in enumerate(rows, 1):
+            buf += field_count
+            for c, enc in zip(cols, encoders):
+                v = r[c]
+                if v is None:
+                    buf += _NULL
+                else:
+                    data = enc(v)
+                    buf += struct.pack("!i", len(data))
+                    buf += data
+            if n % COPY_BATCH == 0:
+                yield bytes(buf)
+                buf.clear()
+        buf += _PGCOPY_TRAILER
+        yield bytes(buf)
+
+    return stream()
+
+
+async def _insert_copy(db: AsyncSession, model, rows: list[dict]):
+    table = model.__table__
+    cols = list(rows[0].keys())
+
+    # pending orm rows (the parent resume/jd) must land first, which also
+    # opens the transaction the copy then joins
+    await db.flush()
+    conn = await db.connection()
+    raw = (await conn.get_raw_connection()).driver_connection
+    await raw.copy_to_table(
+        table.name, source=_copy_stream(table, cols, rows),
+        columns=cols, format="binary")
+
+
+_WRITERS = {
+    "orm": _insert_orm,
+    "values": _insert_values,
+    "copy": _insert_copy,
+}
+
+
+async def insert_chunks(db: AsyncSession, model, rows: list[dict], mode: str = None):
+    """write chunk rows for `model` (ResumeChunk / JDChunk) in the session's transaction.
+
+    rows are column -> value dicts with embeddings as float lists; ids are
+    generated here. mode defaults to cfg.chunk_insert_mode.
+    """
+    if not rows:
+        return
+    mode = mode or cfg.chunk_insert_mode
+    if mode not in _WRITERS:
+        raise ValueError(f"Unknown chunk_insert_mode: {mode}")
+    if mode == "copy" and db.bind.dialect.driver != "asyncpg":
+        mode = "values"
+    await _WRITERS[mode](db, model, _with_ids(rows))
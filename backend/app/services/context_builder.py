@@ -0,0 +1,143 @@
+import math
+import re
+from collections import Counter
+from app.core.config import get_settings
+from app.utils.tokens import count_tokens
+
+cfg = get_settings()
+
+# prompt budget (tokens) for retrieved resume context, by model name prefix.
+# cfg.context_token_budget overrides when set
+MODEL_CONTEXT_BUDGETS = {
+    "gpt-4o-mini": 1500,
+    "gpt-4o": 2000,
+    "gemini": 2000,
+}
+DEFAULT_CONTEXT_BUDGET = 1500
+
+SEPARATOR = "\n\n---\n\n"
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_STOP = frozenset("""
+a an and are as at be but by for from has have in is it its of on or our that
+the their this to we will with you your who what all any can may must not also
+""".split())
+
+
+def context_budget() -> int:
+    if cfg.context_token_budget:
+        return cfg.context_token_budget
+    model = cfg.openai_llm if cfg.ai_provider == "openai" else cfg.gemini_llm
+    for prefix, budget in MODEL_CONTEXT_BUDGETS.items():
+        if model.startswith(prefix):
+            return budget
+    return DEFAULT_CONTEXT_BUDGET
+
+
+def _join_overlapping(a: str, b: str) -> str:
+    """concatenate two neighbouring chunks, dropping the text chunk_overlap repeated"""
+    longest = min(len(a), len(b), cfg.chunk_overlap * 2)
+    for n in range(longest, 9, -1):
+        if a.endswith(b[:n]):
+            return a + b[n:]
+    return a + "\n" + b
+
+
+def _merge_adjacent(chunks: list[dict]) -> list[dict]:
+    """merge chunks that are consecutive in the same section into one block.
+
+    blocks keep the rank of their best chunk.
+    """
+    ranked = {id(ch): rank for rank, ch in enumerate(chunks)}
+    ordered = sorted(chunks, key=lambda ch: ch.get("index", 0))
+
+    blocks = []
+    for ch in ordered:
+        prev = blocks[-1] if blocks else None
+        if (prev and prev["section"] == ch.get("section")
+                and prev["last_index"] + 1 == ch.get("index")):
+            prev["content"] = _join_overlapping(prev["content"], ch["content"])
+            prev["last_index"] = ch["index"]
+            prev["rank"] = min(prev["rank"], ranked[id(ch)])
+            continue
+        blocks.append({
+            "content": ch["content"],
+            "section": ch.get("section"),
+            "last_index": ch.get("index", 0),
+            "rank": ranked[id(ch)],
+        })
+
+    blocks.sort(key=lambda b: b["rank"])
+    return blocks
+
+
+def _format(section: str, content: str) -> str:
+    label = (section or "general").upper()
+    return f"[{label}] {content}"
+
+
+def build_budgeted_context(chunks: list[dict], budget: int = None) -> str:
+    """best-first chunks that fit the token budget, deduped and merged by section.
+
+    chunks must be ordered best first (as find_relevant_chunks returns them).
+    """
+    budget = budget or context_budget()
+    sep_cost = count_tokens(SEPARATOR)
+
+    picked, seen, used = [], set(), 0
+    for ch in chunks:
+        text = ch["content"].strip()
+        if not text or text in seen:
+            continue
+        cost = count_tokens(_format(ch.get("section"), text)) + sep_cost
+        if used + cost > budget:
+            continue
+        seen.add(text)
+        picked.append(ch)
+        used += cost
+
+    blocks = _merge_adjacent(picked)
+    return SEPARATOR.join(_format(b["section"], b["content"]) for b in blocks)
+
+
+def _terms(text: str) -> list[str]:
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOP and len(w) > 1]
+
+
+def trim_text(text: str, budget: int, focus: str = None) -> str:
+    """cut text down to `budget` tokens keeping its most relevant lines, in order.
+
+    a line scores by how many of the document's recurring terms it carries
+    (so boilerplate like benefits or eeo statements drops first), plus a
+    boost for terms that also appear in `focus`.
+    """
+    if count_tokens(text) <= budget:
+        return text
+
+    # lines, with run-on paragraphs broken at sentence ends
+    lines = [
+        part
+        for ln in text.split("\n") if ln.strip()
+        for part in _SENTENCE_END.split(ln) if part.strip()
+    ]
+    doc_freq = Counter(t for ln in lines for t in set(_terms(ln)))
+    focus_terms = set(_terms(focus)) if focus else set()
+
+    def score(ln: str) -> float:
+        terms = set(_terms(ln))
+        if not terms:
+            return 0.0
+        salience = sum(math.log1p(doc_freq[t]) for t in terms) / math.sqrt(len(terms))
+        return salience + 2.0 * len(terms & focus_terms)
+
+    order = sorted(range(len(lines)), key=lambda i: score(lines[i]), reverse=True)
+    keep, used = set(), 0
+    for i in order:
+        cost = count_tokens(lines[i]) + 1
+        if used + cost > budget:
+            continue
+        keep.add(i)
+        used += cost
+
+    return "\n".join(lines[i] for i in sorted(keep))
@@ -0,0 +1,82 @@
+import hashlib
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import get_settings
+from app.core.database import session_factory
+from app.models import EmbeddingCache
+from app.utils.lru import LRUCache
+
+cfg = get_settings()
+
+# hot tier in front of the embedding_cache table
+_mem = LRUCache(maxsize=cfg.embed_cache_size)
+
+
+def cache_key(text: str) -> str:
+    """content address for a text under the current provider/model/dims"""
+    h = hashlib.sha256()
+    for part in (cfg.ai_provider, cfg.embed_model, str(cfg.embed_dims), text):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+async def get_many(keys: list[str]) -> dict[str, list[float]]:
+    """look keys up in the lru first, then postgres; returns only hits"""
+    found = {}
+    missing = []
+    for k in keys:
+        vec = _mem.get(k)
+        if vec is not None:
+            found[k] = vec
+        else:
+            missing.append(k)
+
+    if not missing:
+        return found
+
+    try:
+        async with session_factory() as db:
+            result = await db.execute(
+                select(EmbeddingCache.key, EmbeddingCache.embedding)
+                .where(EmbeddingCache.key.in_(missing))
+            )
+            rows = result.fetchall()
+    except Exception as e:
+        # the cache is an optimisation, never fail an embed because of it
+        print(f"Embedding cache lookup failed: {e}")
+        return found
+
+    for r in rows:
+        vec = [float(x) for x in r.embedding]
+        _mem.set(r.key, vec)
+        found[r.key] = vec
+    return found
+
+
+async def put_many(items: dict[str, list[float]]):
+    if not items:
+        return
+
+    for k, vec in items.items():
+        _mem.set(k, vec)
+
+    rows = [
+        {
+            "key": k,
+            "provider": cfg.ai_provider,
+            "model": cfg.embed_model,
+            "dims": len(vec),
+            "embedding": vec,
+        }
+        for k, vec in items.items()
+    ]
+    try:
+        async with session_factory() as db:
+            await db.execute(
+                insert(EmbeddingCache).values(rows)
+                .on_conflict_do_nothing(index_elements=["key"])
+            )
+            await db.commit()
+    except Exception as e:
+        print(f"Embedding cache write failed: {e}")
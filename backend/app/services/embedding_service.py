@@ -1,42 +1,65 @@
-from google import genai
-from openai import AsyncOpenAI
+import asyncio
+import numpy as np
 from app.core.config import get_settings
+from app.core.llm import get_llm
+from app.services import embedding_cache
 
 cfg = get_settings()
 
-if cfg.ai_provider == "openai":
-    openai_client = AsyncOpenAI(api_key=cfg.openai_key)
 
-if cfg.ai_provider == "gemini":
-    gemini_client = genai.Client(api_key=cfg.gemini_key)
+def _batches(texts: list[str], sz: int) -> list[list[str]]:
+    sz = max(1, sz)
+    return [texts[i:i + sz] for i in range(0, len(texts), sz)]
+
+
+def _truncate(vecs: list[list[float]], dims: int) -> list[list[float]]:
+    """cut to `dims` and rescale to unit length.
+
+    providers only normalize full-size outputs (gemini) or may ignore the
+    size hint, so this is applied to everything when truncating.
+    """
+    mat = np.asarray([v[:dims] for v in vecs], dtype=np.float32)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (mat / norms).tolist()
+
+
+async def _embed_uncached(texts: list[str]) -> list[list[float]]:
+    # the llm client caps how many of these are in flight (embed_concurrency)
+    llm = get_llm()
+    batches = _batches(texts, cfg.embed_batch_sz)
+    results = await asyncio.gather(*(llm.embed(b) for b in batches))
+    vecs = [vec for batch in results for vec in batch]
+    if cfg.embed_truncate_dims and vecs:
+        vecs = _truncate(vecs, cfg.embed_dims)
+    return vecs
 
 
 async def embed_batch(texts: list[str]) -> list[list[float]]:
-    if cfg.ai_provider == "openai":
-        resp = await openai_client.embeddings.create(
-            model=cfg.openai_embed_model,
-            input=texts,
-        )
-        return [item.embedding for item in resp.data]
-
-    # gemini new sdk
-    results = []
-    for t in texts:
-        resp = gemini_client.models.embed_content(
-            model=cfg.gemini_embed_model,
-            contents=t,
-        )
-        results.append(resp.embeddings[0].values)
-    return results
+    if not texts:
+        return []
+
+    if not cfg.embed_cache_enabled:
+        return await _embed_uncached(texts)
+
+    keys = [embedding_cache.cache_key(t) for t in texts]
+    found = await embedding_cache.get_many(list(dict.fromkeys(keys)))
+
+    # embed each distinct missing text once, even if repeated in the input
+    todo = {}
+    for k, t in zip(keys, texts):
+        if k not in found and k not in todo:
+            todo[k] = t
+
+    if todo:
+        fresh = await _embed_uncached(list(todo.values()))
+        new = dict(zip(todo.keys(), fresh))
+        await embedding_cache.put_many(new)
+        found.update(new)
+
+    return [found[k] for k in keys]
 
 
 async def embed_one(text: str) -> list[float]:
-    if cfg.ai_provider == "openai":
-        result = await embed_batch([text])
-        return result[0]
-
-    resp = gemini_client.models.embed_content(
-        model=cfg.gemini_embed_model,
-        contents=text,
-    )
-    return resp.embeddings[0].values
+    result = await embed_batch([text])
+    return result[0]
@@ -1,17 +1,58 @@
+import copy
+import hashlib
 import json
-from google import genai
-from openai import AsyncOpenAI
 from app.core.config import get_settings
-from app.services.retrieval_service import find_relevant_chunks, build_context
+from app.core.llm import complete, get_llm
+from app.services.retrieval_service import find_relevant_chunks
+from app.services.context_builder import build_budgeted_context, trim_text
+from app.utils.lru import LRUCache
 from sqlalchemy.ext.asyncio import AsyncSession
 
 cfg = get_settings()
 
-if cfg.ai_provider == "openai":
-    openai_client = AsyncOpenAI(api_key=cfg.openai_key)
+MATCH_TEMP = 0.3
+COVER_LETTER_TEMP = 0.7
+INTERVIEW_TEMP = 0.5
 
-if cfg.ai_provider == "gemini":
-    gemini_client = genai.Client(api_key=cfg.gemini_key)
+# prompt defaults, shared by the prompt builders and their cache keys
+DEFAULT_TONE = "professional"
+DEFAULT_NUM_Q = 8
+
+# bump whenever a prompt template or its retrieval settings change,
+# so cached results from the old prompt stop being served
+PROMPT_VERSION = "2"
+
+_results = LRUCache(maxsize=cfg.gen_cache_size, ttl=cfg.gen_cache_ttl_s)
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def result_cache_key(kind: str, resume_text: str, jd_text: str, **params) -> str:
+    """key for a generated result: content hashes, kind, params and prompt version"""
+    parts = [
+        PROMPT_VERSION,
+        cfg.ai_provider,
+        kind,
+        _sha(resume_text),
+        _sha(jd_text),
+        sorted(params.items()),
+    ]
+    return _sha(json.dumps(parts, default=str))
+
+
+def get_cached_result(cache_key: str):
+    if not cfg.gen_cache_enabled or not cache_key:
+        return None
+    hit = _results.get(cache_key)
+    # callers are free to mutate what they get back
+    return copy.deepcopy(hit) if hit is not None else None
+
+
+def cache_result(cache_key: str, value):
+    if cfg.gen_cache_enabled and cache_key:
+        _results.set(cache_key, copy.deepcopy(value))
 
 
 def _clean_json(raw: str) -> str:
@@ -21,30 +62,73 @@ def _clean_json(raw: str) -> str:
     return raw.strip()
 
 
-async def _ask(prompt: str, temp: float = 0.5) -> str:
-    if cfg.ai_provider == "openai":
-        resp = await openai_client.chat.completions.create(
-            model=cfg.openai_llm,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=temp,
-        )
-        return resp.choices[0].message.content.strip()
+def parse_json_result(raw: str):
+    return json.loads(_clean_json(raw.strip()))
+
+
+async def _context(db: AsyncSession, rid: str, job_text: str, jd_id: str = None) -> str:
+    """resume context for the prompt, sized to the model's token budget"""
+    chunks = await find_relevant_chunks(
+        db, rid, job_text, top_k=cfg.retrieval_candidates, jd_id=jd_id)
+    return build_budgeted_context(chunks)
+
+
+def stream_text(prompt: str, temp: float):
+    """async iterator of text deltas from the configured provider"""
+    return get_llm().stream(prompt, temp)
+
+
+# each generator is a prepare_* (db: retrieve context, build the prompt) and
+# a run_* (llm only). run_* never touches the db, so callers can release
+# their session before the (slow) provider call
+async def run_match(prompt: str) -> dict:
+    raw = await complete(prompt, temp=MATCH_TEMP)
+    return parse_json_result(raw)
+
 
-    resp = gemini_client.models.generate_content(
-        model=cfg.gemini_llm,
-        contents=prompt,
-        config={"temperature": temp},
-    )
-    return resp.text.strip()
+async def run_cover_letter(prompt: str) -> str:
+    return await complete(prompt, temp=COVER_LETTER_TEMP)
 
 
-async def analyze_match(db: AsyncSession, rid: str, job_text: str) -> dict:
-    """compare resume against jd, return scores and skill breakdown"""
+async def run_interview(prompt: str) -> list[dict]:
+    raw = await complete(prompt, temp=INTERVIEW_TEMP)
+    return parse_json_result(raw)
 
-    chunks = await find_relevant_chunks(db, rid, job_text, top_k=8)
-    ctx = build_context(chunks)
 
-    prompt = f"""You are an expert career advisor and resume analyst.
+# result cache keys. each takes the same parameters as its
+# prepare_*, so a default that changes there changes the key with it
+def match_key(resume_text: str, jd_text: str) -> str:
+    return result_cache_key("match", resume_text, jd_text)
+
+
+def cover_letter_key(
+    resume_text: str,
+    jd_text: str,
+    company: str = "",
+    role: str = "",
+    tone: str = DEFAULT_TONE,
+) -> str:
+    return result_cache_key(
+        "cover_letter", resume_text, jd_text, company=company, role=role, tone=tone)
+
+
+def interview_key(
+    resume_text: str,
+    jd_text: str,
+    company: str = "",
+    num_q: int = DEFAULT_NUM_Q,
+) -> str:
+    return result_cache_key(
+        "interview", resume_text, jd_text, company=company, num_q=num_q)
+
+
+async def prepare_match(db: AsyncSession, rid: str, job_text: str, jd_id: str = None) -> str:
+    """retrieve resume context and build the match prompt"""
+
+    ctx = await _context(db, rid, job_text, jd_id)
+    jd_text = trim_text(job_text, cfg.jd_token_budget)
+
+    return f"""You are an expert career advisor and resume analyst.
 
 Given the candidate's resume excerpts and a job description, provide a detailed match analysis.
 
@@ -52,7 +136,7 @@ RESUME EXCERPTS:
 {ctx}
 
 JOB DESCRIPTION:
-{job_text}
+{jd_text}
 
 Respond in this exact JSON format:
 {{
@@ -66,27 +150,25 @@ Respond in this exact JSON format:
 
 Be specific and reference actual content from the resume. Only return valid JSON, no markdown."""
 
-    raw = await _ask(prompt, temp=0.3)
-    return json.loads(_clean_json(raw))
 
-
-async def write_cover_letter(
+async def prepare_cover_letter(
     db: AsyncSession,
     rid: str,
     job_text: str,
     company: str = "",
     role: str = "",
-    tone: str = "professional",
+    tone: str = DEFAULT_TONE,
+    jd_id: str = None,
 ) -> str:
-    """generate a tailored cover letter using rag"""
+    """retrieve resume context and build the cover letter prompt"""
 
-    chunks = await find_relevant_chunks(db, rid, job_text, top_k=8)
-    ctx = build_context(chunks)
+    ctx = await _context(db, rid, job_text, jd_id)
+    jd_text = trim_text(job_text, cfg.jd_token_budget)
 
     at_company = f" at {company}" if company else ""
     for_role = f" for the {role} role" if role else ""
 
-    prompt = f"""You are an expert cover letter writer.
+    return f"""You are an expert cover letter writer.
 
 Write a compelling, tailored cover letter{for_role}{at_company} using the candidate's actual experience.
 
@@ -94,7 +176,7 @@ CANDIDATE'S RELEVANT EXPERIENCE:
 {ctx}
 
 JOB DESCRIPTION:
-{job_text}
+{jd_text}
 
 GUIDELINES:
 - Tone: {tone}
@@ -107,24 +189,23 @@ GUIDELINES:
 
 Write just the cover letter body (no headers/addresses)."""
 
-    return await _ask(prompt, temp=0.7)
-
 
-async def prep_interview(
+async def prepare_interview(
     db: AsyncSession,
     rid: str,
     job_text: str,
     company: str = "",
-    num_q: int = 8,
-) -> list[dict]:
-    """generate interview questions with suggested answers from resume"""
+    num_q: int = DEFAULT_NUM_Q,
+    jd_id: str = None,
+) -> str:
+    """retrieve resume context and build the interview prep prompt"""
 
-    chunks = await find_relevant_chunks(db, rid, job_text, top_k=8)
-    ctx = build_context(chunks)
+    ctx = await _context(db, rid, job_text, jd_id)
+    jd_text = trim_text(job_text, cfg.jd_token_budget)
 
     at_co = f" at {company}" if company else ""
 
-    prompt = f"""You are a senior technical interviewer{at_co}.
+    return f"""You are a senior technical interviewer{at_co}.
 
 Based on the job description and the candidate's background, generate {num_q} likely interview questions with suggested answer frameworks.
 
@@ -132,7 +213,7 @@ CANDIDATE'S BACKGROUND:
 {ctx}
 
 JOB DESCRIPTION:
-{job_text}
+{jd_text}
 
 For each question, provide:
 1. The question
@@ -151,6 +232,3 @@ Return as a JSON array:
 ]
 
 Only return valid JSON, no markdown."""
-
-    raw = await _ask(prompt, temp=0.5)
-    return json.loads(_clean_json(raw))
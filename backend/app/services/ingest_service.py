@@ -0,0 +1,173 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import select, update
+from sqlalchemy.orm import defer
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.database import session_factory
+from app.models import IngestJob
+from app.services.resume_service import process_resume
+from app.services.jd_service import process_jd
+
+cfg = get_settings()
+
+_queue: asyncio.Queue = asyncio.Queue()
+_workers: list[asyncio.Task] = []
+
+
+async def enqueue_resume(db: AsyncSession, fname: str, raw_bytes: bytes, family_id: str = None) -> IngestJob:
+    job = IngestJob(kind="resume", payload={"filename": fname, "family_id": family_id}, data=raw_bytes)
+    db.add(job)
+    await db.commit()
+    _queue.put_nowait(job.id)
+    return job
+
+
+async def enqueue_jd(db: AsyncSession, title: str, raw_text: str, company: str = None, url: str = None) -> IngestJob:
+    job = IngestJob(kind="jd", payload={
+        "title": title,
+        "raw_text": raw_text,
+        "company": company,
+        "url": url,
+    })
+    db.add(job)
+    await db.commit()
+    _queue.put_nowait(job.id)
+    return job
+
+
+async def get_job(db: AsyncSession, job_id: str) -> IngestJob | None:
+    jobs = await get_jobs(db, [job_id])
+    return jobs[0] if jobs else None
+
+
+async def get_jobs(db: AsyncSession, job_ids: list[str]) -> list[IngestJob]:
+    # status polling never needs the uploaded bytes
+    result = await db.execute(
+        select(IngestJob)
+        .options(defer(IngestJob.data))
+        .where(IngestJob.id.in_(job_ids))
+    )
+    return result.scalars().all()
+
+
+async def _claim(job_id: str) -> IngestJob | None:
+    """flip pending -> running atomically, so only one worker (in any process) runs it"""
+    async with session_factory() as db:
+        result = await db.execute(
+            update(IngestJob)
+            .where(IngestJob.id == job_id, IngestJob.status == "pending")
+            .values(status="running", updated_at=datetime.utcnow())
+            .returning(IngestJob.id)
+        )
+        claimed = result.scalar_one_or_none()
+        await db.commit()
+        if not claimed:
+            return None
+        return await db.get(IngestJob, job_id)
+
+
+async def _finish(job_id: str, **values):
+    async with session_factory() as db:
+        await db.execute(
+            update(IngestJob)
+            .where(IngestJob.id == job_id)
+            .values(updated_at=datetime.utcnow(), **values)
+        )
+        await db.commit()
+
+
+async def _heartbeat(job_id: str):
+    """keep a running job's updated_at fresh, so a process starting up
+    doesn't take a long job for an orphaned one and run it again"""
+    while True:
+        await asyncio.sleep(cfg.ingest_heartbeat_s)
+        try:
+            async with session_factory() as db:
+                await db.execute(
+                    update(IngestJob)
+                    .where(IngestJob.id == job_id, IngestJob.status == "running")
+                    .values(updated_at=datetime.utcnow())
+                )
+                await db.commit()
+        except Exception as e:
+            print(f"Ingest job {job_id} heartbeat failed: {e}")
+
+
+async def _run(job_id: str):
+    job = await _claim(job_id)
+    if not job:
+        return
+
+    beat = asyncio.create_task(_heartbeat(job_id))
+    try:
+        async with session_factory() as db:
+            if job.kind == "resume":
+                res = await process_resume(
+                    db, job.payload["filename"], job.data, job.payload.get("family_id"))
+            else:
+                p = job.payload
+                res = await process_jd(
+                    db, p["title"], p["raw_text"], p.get("company"), p.get("url"))
+        await _finish(job_id, status="done", result_id=res.id, data=None)
+    except Exception as e:
+        print(f"Ingest job {job_id} ({job.kind}) failed: {e}")
+        await _finish(job_id, status="failed", error=str(e)[:500], data=None)
+    finally:
+        beat.cancel()
+
+
+async def _worker():
+    while True:
+        job_id = await _queue.get()
+        try:
+            await _run(job_id)
+        except Exception as e:
+            # never let one bad job kill the worker
+            print(f"Ingest worker error on {job_id}: {e}")
+        finally:
+            _queue.task_done()
+
+
+async def _requeue_leftovers():
+    """pick up jobs left pending (or orphaned mid-run) by a previous process"""
+    stale = datetime.utcnow() - timedelta(seconds=cfg.ingest_stale_s)
+    async with session_factory() as db:
+        await db.execute(
+            update(IngestJob)
+            .where(IngestJob.status == "running", IngestJob.updated_at < stale)
+            .values(status="pending")
+        )
+        await db.commit()
+        result = await db.execute(
+            select(IngestJob.id)
+            .where(IngestJob.status == "pending")
+            .order_by(IngestJob.created_at)
+        )
+        for job_id in result.scalars().all():
+            _queue.put_nowait(job_id)
+
+
+async def start_workers():
+    await _requeue_leftovers()
+    for _ in range(max(1, cfg.ingest_workers)):
+        _workers.append(asyncio.create_task(_worker()))
+
+
+async def stop_workers():
+    for t in _workers:
+        t.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+def job_status(job: IngestJob) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "result_id": job.result_id,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
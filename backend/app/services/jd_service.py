@@ -1,8 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import defer
 from app.models import JobDescription, JDChunk
 from app.utils.chunker import chunk_text
 from app.services.embedding_service import embed_batch
+from app.services.chunk_store import insert_chunks
+from app.utils.pagination import DEFAULT_PAGE_SIZE, keyset, page
 
 
 async def process_jd(db: AsyncSession, title: str, raw_text: str, company: str = None, url: str = None) -> JobDescription:
@@ -16,9 +19,10 @@ async def process_jd(db: AsyncSession, title: str, raw_text: str, company: str =
     chunks = chunk_text(raw_text)
     if chunks:
         embeds = await embed_batch(chunks)
-        for i, (content, emb) in enumerate(zip(chunks, embeds)):
-            ch = JDChunk(jd_id=jd.id, content=content, idx=i, embedding=emb)
-            db.add(ch)
+        await insert_chunks(db, JDChunk, [
+            {"jd_id": jd.id, "content": content, "idx": i, "embedding": emb}
+            for i, (content, emb) in enumerate(zip(chunks, embeds))
+        ])
 
     await db.commit()
     await db.refresh(jd)
@@ -32,8 +36,33 @@ async def get_jd(db: AsyncSession, jid: str) -> JobDescription | None:
     return result.scalar_one_or_none()
 
 
-async def get_all_jds(db: AsyncSession) -> list[JobDescription]:
+async def get_jds(db: AsyncSession, jids: list[str]) -> dict[str, JobDescription]:
+    """id -> jd for the ones that exist, without raw_text"""
     result = await db.execute(
-        select(JobDescription).order_by(JobDescription.created_at.desc())
+        select(JobDescription)
+        .where(JobDescription.id.in_(jids))
+        .options(defer(JobDescription.raw_text, raiseload=True))
     )
-    return result.scalars().all()
+    return {jd.id: jd for jd in result.scalars().all()}
+
+
+async def get_all_jds(
+    db: AsyncSession,
+    cursor: str = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    include_body: bool = False,
+) -> tuple[list[JobDescription], str | None]:
+    """newest-first page of jds and the cursor for the next one.
+
+    raw_text and the extracted json are only loaded when include_body is set.
+    """
+    stmt = select(JobDescription)
+    if not include_body:
+        stmt = stmt.options(
+            defer(JobDescription.raw_text, raiseload=True),
+            defer(JobDescription.extracted_skills, raiseload=True),
+            defer(JobDescription.extracted_reqs, raiseload=True),
+        )
+    stmt = keyset(stmt, JobDescription.created_at, JobDescription.id, cursor, limit)
+    result = await db.execute(stmt)
+    return page(result.scalars().all(), limit, lambda j: (j.created_at, j.id))
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from threading import Lock
+from app.core.config import get_settings
+
+cfg = get_settings()
+
+# bump when pdf_generator's output changes so stale renders aren't served
+RENDER_VERSION = "1"
+
+_lock = Lock()
+# key -> file size, least recently used first. loaded from disk on first use
+_index: OrderedDict | None = None
+_total = 0
+
+
+def cache_dir() -> str:
+    return cfg.pdf_cache_dir or os.path.join(tempfile.gettempdir(), "jobwise-pdf-cache")
+
+
+def cache_key(resume_data: dict | str) -> str:
+    """content address of a tailored resume (build_tailored_resume's dict).
+
+    the download filename isn't part of it, the pdf bytes don't depend on it.
+    """
+    raw = json.dumps([RENDER_VERSION, resume_data], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(cache_dir(), f"{key}.pdf")
+
+
+def _scan():
+    """rebuild the index from disk, oldest mtime first. other worker
+    processes share the directory, so eviction rescans before deleting"""
+    global _index, _total
+    entries = []
+    os.makedirs(cache_dir(), exist_ok=True)
+    with os.scandir(cache_dir()) as it:
+        for e in it:
+            if not e.name.endswith(".pdf"):
+                continue
+            try:
+                st = e.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, e.name[:-4], st.st_size))
+    entries.sort()
+    _index = OrderedDict((k, size) for _, k, size in entries)
+    _total = sum(_index.values())
+
+
+def get(key: str) -> bytes | None:
+    """cached pdf bytes, or None. a hit bumps the file's mtime (its lru position)"""
+    global _total
+    path = _path(key)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)
+    except FileNotFoundError:
+        with _lock:
+            if _index is not None and key in _index:
+                _total -= _index.pop(key)
+        return None
+
+    with _lock:
+        if _index is not None and key in _index:
+            _index.move_to_end(key)
+    return data
+
+
+def put(key: str, data: bytes):
+    """store a render, then evict least recently used files past pdf_cache_max_mb"""
+    global _total
+    limit = cfg.pdf_cache_max_mb * 1024 * 1024
+    if len(data) > limit:
+        return
+
+    with _lock:
+        if _index is None:
+            _scan()
+
+        # write then rename so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=cache_dir(), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, _path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+        _total += len(data) - _index.pop(key, 0)
+        _index[key] = len(data)
+
+        if _total <= limit:
+            return
+
+        # evict down to 90% so a full cache doesn't rescan on every write
+        _scan()
+        while _total > limit * 0.9 and _index:
+            old, size = _index.popitem(last=False)
+            _total -= size
+            try:
+                os.unlink(_path(old))
+            except FileNotFoundError:
+                pass
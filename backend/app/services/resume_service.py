@@ -1,20 +1,77 @@
+import asyncio
+import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.models import Resume, ResumeChunk
-from app.utils.pdf_parser import extract_text, split_into_sections
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer
+from app.core.config import get_settings
+from app.core.errors import ResumeVersionConflictError
+from app.core.executors import run_in_process
+from app.models import Resume, ResumeChunk, ResumeChunkLink
+from app.utils.pdf_parser import parse_resume_pdf
 from app.utils.chunker import chunk_by_section, chunk_text
+from app.utils.pagination import DEFAULT_PAGE_SIZE, keyset, page
 from app.services.embedding_service import embed_batch
+from app.services.chunk_store import insert_chunks
+from app.services.resume_versions import (
+    chunk_ids_by_hash, chunks_of, chunk_idx, content_hash, is_latest,
+    latest_version, release_chunks)
 
+cfg = get_settings()
 
-async def process_resume(db: AsyncSession, fname: str, raw_bytes: bytes) -> Resume:
-    """parse pdf, chunk it, embed chunks, save to db"""
 
-    txt = extract_text(raw_bytes)
-    sections = split_into_sections(txt)
+async def parse_pdf(raw_bytes: bytes) -> tuple[str, dict]:
+    """extract text and sections off the event loop, with size/page/time limits"""
+    if len(raw_bytes) > cfg.pdf_max_mb * 1024 * 1024:
+        raise ValueError(f"File too large, {cfg.pdf_max_mb}MB max")
 
-    res = Resume(filename=fname, raw_text=txt, parsed_data=sections)
+    try:
+        return await run_in_process(
+            "pdf_parse",
+            cfg.pdf_parse_workers,
+            parse_resume_pdf,
+            raw_bytes,
+            cfg.pdf_max_pages,
+            timeout=cfg.pdf_parse_timeout_s,
+        )
+    except asyncio.TimeoutError:
+        raise ValueError("PDF took too long to parse")
+
+
+async def process_resume(db: AsyncSession, fname: str, raw_bytes: bytes, family_id: str = None) -> Resume:
+    """parse pdf, chunk it, embed chunks, save to db.
+
+    an upload is a new version of `family_id` if given, otherwise the first
+    version of a new family. only chunks that differ from the previous
+    version are embedded and stored; unchanged ones are linked.
+    """
+
+    txt, sections = await parse_pdf(raw_bytes)
+
+    parent = await latest_version(db, family_id) if family_id else None
+    if family_id and parent is None:
+        raise ValueError("Unknown resume family")
+    if parent is not None and parent.raw_text == txt:
+        # same document again, nothing to store
+        return parent
+
+    rid = str(uuid.uuid4())
+    res = Resume(
+        id=rid,
+        filename=fname,
+        raw_text=txt,
+        parsed_data=sections,
+        family_id=parent.family_id if parent else rid,
+        version=parent.version + 1 if parent else 1,
+        parent_id=parent.id if parent else None,
+    )
     db.add(res)
-    await db.flush()
+    try:
+        await db.flush()
+    except IntegrityError:
+        # a concurrent upload to the same family got this version number
+        await db.rollback()
+        raise ResumeVersionConflictError()
 
     # chunk by section if we found multiple, otherwise just chunk the whole thing
     if sections and len(sections) > 1:
@@ -30,18 +87,35 @@ async def process_resume(db: AsyncSession, fname: str, raw_bytes: bytes) -> Resu
         await db.commit()
         return res
 
-    texts = [c["content"] for c in chunks]
-    embeds = await embed_batch(texts)
+    hashes = [content_hash(c["section"], c["content"]) for c in chunks]
+    known = await chunk_ids_by_hash(db, parent.id) if parent else {}
 
-    for info, emb in zip(chunks, embeds):
-        ch = ResumeChunk(
-            resume_id=res.id,
-            content=info["content"],
-            idx=info["index"],
-            section=info["section"],
-            embedding=emb,
-        )
-        db.add(ch)
+    # one new row per distinct changed chunk
+    fresh = {}
+    for h, info in zip(hashes, chunks):
+        if h not in known and h not in fresh:
+            fresh[h] = info
+
+    if fresh:
+        embeds = await embed_batch([info["content"] for info in fresh.values()])
+        rows = []
+        for (h, info), emb in zip(fresh.items(), embeds):
+            known[h] = str(uuid.uuid4())
+            rows.append({
+                "id": known[h],
+                "resume_id": rid,
+                "content": info["content"],
+                "idx": info["index"],
+                "section": info["section"],
+                "content_hash": h,
+                "embedding": emb,
+            })
+        await insert_chunks(db, ResumeChunk, rows)
+
+    await db.execute(insert(ResumeChunkLink).values([
+        {"resume_id": rid, "chunk_id": known[h], "idx": info["index"]}
+        for h, info in zip(hashes, chunks)
+    ]))
 
     await db.commit()
     await db.refresh(res)
@@ -53,15 +127,37 @@ async def get_resume(db: AsyncSession, rid: str) -> Resume | None:
     return result.scalar_one_or_none()
 
 
-async def get_all(db: AsyncSession) -> list[Resume]:
-    result = await db.execute(select(Resume).order_by(Resume.created_at.desc()))
-    return result.scalars().all()
+async def get_all(
+    db: AsyncSession,
+    cursor: str = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    include_body: bool = False,
+    all_versions: bool = False,
+) -> tuple[list[Resume], str | None]:
+    """newest-first page of resumes and the cursor for the next one.
+
+    only the latest version of each resume unless all_versions is set;
+    raw_text is only loaded when include_body is set.
+    """
+    stmt = select(Resume)
+    if not all_versions:
+        stmt = stmt.where(is_latest())
+    if not include_body:
+        stmt = stmt.options(defer(Resume.raw_text, raiseload=True))
+    stmt = keyset(stmt, Resume.created_at, Resume.id, cursor, limit)
+    result = await db.execute(stmt)
+    return page(result.scalars().all(), limit, lambda r: (r.created_at, r.id))
 
 
 async def get_chunks(db: AsyncSession, rid: str) -> list[ResumeChunk]:
     result = await db.execute(
-        select(ResumeChunk)
-        .where(ResumeChunk.resume_id == rid)
-        .order_by(ResumeChunk.idx)
+        chunks_of(select(ResumeChunk), rid).order_by(chunk_idx)
     )
     return result.scalars().all()
+
+
+async def delete_resume(db: AsyncSession, res: Resume):
+    """delete one version, keeping chunk rows that other versions still use"""
+    await release_chunks(db, res.id)
+    await db.delete(res)
+    await db.commit()
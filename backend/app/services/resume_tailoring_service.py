@@ -1,66 +1,23 @@
+import asyncio
 import json
-from google import genai
-from openai import AsyncOpenAI
-from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import get_settings
-from app.services.retrieval_service import find_relevant_chunks, build_context
-from app.services.resume_service import get_resume
-from app.services.jd_service import get_jd
+from app.core.errors import RenderTimeoutError
+from app.core.executors import run_in_process
+from app.core.llm import complete
+from app.services import pdf_cache
+from app.services.context_builder import trim_text
 
 cfg = get_settings()
 
-if cfg.ai_provider == "openai":
-    openai_client = AsyncOpenAI(api_key=cfg.openai_key)
-if cfg.ai_provider == "gemini":
-    gemini_client = genai.Client(api_key=cfg.gemini_key)
 
+TAILOR_SECTIONS = ['header', 'education', 'skills', 'experience', 'projects']
 
-async def _ask_ai(prompt: str, temp: float = 0.3) -> str:
-    """Helper to call AI provider"""
-    if cfg.ai_provider == "openai":
-        resp = await openai_client.chat.completions.create(
-            model=cfg.openai_llm,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=temp,
-        )
-        return resp.choices[0].message.content.strip()
-
-    resp = gemini_client.models.generate_content(
-        model=cfg.gemini_llm,
-        contents=prompt,
-        config={"temperature": temp},
-    )
-    return resp.text.strip()
-
-
-async def generate_resume_suggestions(
-    db: AsyncSession,
-    resume_id: str,
-    jd_id: str
-) -> dict:
-    """Generate section-by-section resume improvement suggestions"""
 
-    resume = await get_resume(db, resume_id)
-    jd = await get_jd(db, jd_id)
-
-    if not resume or not jd:
-        raise ValueError("Resume or JD not found")
-
-    parsed = resume.parsed_data or {}
-    sections = ['header', 'education', 'skills', 'experience', 'projects']
-
-    suggestions = {}
-
-    for section in sections:
-        if section not in parsed:
-            continue
-
-        original = parsed[section]
-
-        prompt = f"""You are an expert resume writer and ATS optimization specialist.
+def _section_prompt(section: str, original: str, jd_text: str) -> str:
+    return f"""You are an expert resume writer and ATS optimization specialist.
 
 JOB DESCRIPTION:
-{jd.raw_text[:1500]}
+{trim_text(jd_text, cfg.tailor_jd_token_budget, focus=original)}
 
 CURRENT RESUME SECTION ({section.upper()}):
 {original}
@@ -84,31 +41,65 @@ Return ONLY valid JSON:
     "reasoning": "why these changes help for this specific role"
 }}"""
 
-        try:
-            raw = await _ask_ai(prompt, temp=0.3)
-            cleaned = raw.replace("```json", "").replace("```", "").strip()
-            data = json.loads(cleaned)
-
-            suggestions[section] = {
-                "original": original,
-                "improved": data.get("improved", original),
-                "changes": data.get("changes", []),
-                "reasoning": data.get("reasoning", ""),
-                "approved": False
-            }
-        except Exception as e:
-            print(f"Failed to generate suggestion for {section}: {e}")
-            suggestions[section] = {
-                "original": original,
-                "improved": original,
-                "changes": [],
-                "reasoning": "Could not generate suggestions",
-                "approved": False
-            }
+
+async def _suggest_section(section: str, original: str, jd_text: str, sem: asyncio.Semaphore) -> tuple[str, dict]:
+    """one llm call for one section; failures fall back to the original text"""
+    try:
+        async with sem:
+            raw = await complete(_section_prompt(section, original, jd_text), temp=0.3)
+        cleaned = raw.replace("```json", "").replace("```", "").strip()
+        data = json.loads(cleaned)
+
+        return section, {
+            "original": original,
+            "improved": data.get("improved", original),
+            "changes": data.get("changes", []),
+            "reasoning": data.get("reasoning", ""),
+            "approved": False
+        }
+    except Exception as e:
+        print(f"Failed to generate suggestion for {section}: {e}")
+        return section, {
+            "original": original,
+            "improved": original,
+            "changes": [],
+            "reasoning": "Could not generate suggestions",
+            "approved": False
+        }
+
+
+async def iter_section_suggestions(parsed: dict, jd_text: str):
+    """yield (section, suggestion) pairs as each concurrent section call finishes"""
+    sem = asyncio.Semaphore(max(1, cfg.tailor_concurrency))
+    tasks = [
+        asyncio.create_task(_suggest_section(s, parsed[s], jd_text, sem))
+        for s in TAILOR_SECTIONS
+        if s in parsed
+    ]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        # client went away mid-stream, don't leave calls running
+        for t in tasks:
+            t.cancel()
+
+
+async def suggestions_for(resume, jd) -> dict:
+    """suggestions for an already-loaded resume and jd; makes no db calls"""
+
+    parsed = resume.parsed_data or {}
+
+    done = {}
+    async for section, suggestion in iter_section_suggestions(parsed, jd.raw_text):
+        done[section] = suggestion
+
+    # keep the usual section order regardless of completion order
+    suggestions = {s: done[s] for s in TAILOR_SECTIONS if s in done}
 
     return {
-        "resume_id": resume_id,
-        "jd_id": jd_id,
+        "resume_id": resume.id,
+        "jd_id": jd.id,
         "job_title": jd.title,
         "company": jd.company,
         "suggestions": suggestions
@@ -128,7 +119,7 @@ def build_tailored_resume(
     """
     resume_dict = {}
 
-    for section in ['header', 'education', 'skills', 'experience', 'projects']:
+    for section in TAILOR_SECTIONS:
         if section in approved_sections and approved_sections[section]:
             resume_dict[section] = approved_sections[section]
         elif section in original_data and original_data[section]:
@@ -136,3 +127,44 @@ def build_tailored_resume(
 
     filename = f"{first_name}_{last_name}_{company.replace(' ', '_')}_Resume.pdf"
     return resume_dict, filename
+
+
+async def render_pdf(resume_data: dict | str, filename: str) -> bytes:
+    """render the tailored resume in the pdf render pool, off the event loop.
+
+    renders are cached on disk by content, so re-exporting the same
+    tailored resume skips reportlab entirely.
+    """
+    key = None
+    if cfg.pdf_cache_enabled:
+        key = pdf_cache.cache_key(resume_data)
+        try:
+            hit = await asyncio.to_thread(pdf_cache.get, key)
+        except OSError as e:
+            print(f"PDF cache read failed: {e}")
+            hit = None
+        if hit is not None:
+            return hit
+
+    # reportlab is only loaded once someone actually exports a pdf
+    from app.utils.pdf_generator import generate_resume_pdf
+
+    try:
+        pdf_bytes = await run_in_process(
+            "pdf_render",
+            cfg.pdf_render_workers,
+            generate_resume_pdf,
+            resume_data,
+            filename,
+            timeout=cfg.pdf_render_timeout_s,
+        )
+    except asyncio.TimeoutError:
+        raise RenderTimeoutError()
+
+    if key:
+        try:
+            await asyncio.to_thread(pdf_cache.put, key, pdf_bytes)
+        except OSError as e:
+            # the cache is an optimisation, never fail an export because of it
+            print(f"PDF cache write failed: {e}")
+    return pdf_bytes
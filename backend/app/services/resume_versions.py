@@ -0,0 +1,82 @@
+import hashlib
+from sqlalchemy import select, update, func, exists
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Resume, ResumeChunk, ResumeChunkLink
+
+# a chunk's position within the version being read. ResumeChunk.idx is only
+# its position in the version that first stored it
+chunk_idx = ResumeChunkLink.idx
+
+
+def content_hash(section: str, content: str) -> str:
+    """what a chunk is matched on across versions.
+
+    the 0003 migration backfills existing rows with the same formula in sql,
+    keep the two in step.
+    """
+    raw = f"{section or ''}\x1f{content}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def chunks_of(stmt, rid: str):
+    """restrict a statement over ResumeChunk to the chunks of resume version `rid`.
+
+    every read of a resume's chunks goes through here (or joins
+    ResumeChunkLink the same way), since rows are shared between versions.
+    """
+    return (
+        stmt.join(ResumeChunkLink, ResumeChunkLink.chunk_id == ResumeChunk.id)
+        .where(ResumeChunkLink.resume_id == rid)
+    )
+
+
+def is_latest():
+    """where clause for resumes that are the newest version in their family"""
+    newer = aliased(Resume)
+    return ~exists().where(
+        newer.family_id == Resume.family_id, newer.version > Resume.version)
+
+
+async def latest_version(db: AsyncSession, family_id: str) -> Resume | None:
+    """newest version of a family"""
+    result = await db.execute(
+        select(Resume)
+        .where(Resume.family_id == family_id)
+        .order_by(Resume.version.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_versions(db: AsyncSession, family_id: str) -> list[Resume]:
+    result = await db.execute(
+        select(Resume)
+        .where(Resume.family_id == family_id)
+        .order_by(Resume.version.desc())
+    )
+    return result.scalars().all()
+
+
+async def chunk_ids_by_hash(db: AsyncSession, rid: str) -> dict[str, str]:
+    """content_hash -> chunk id for the chunks of one version"""
+    result = await db.execute(
+        chunks_of(select(ResumeChunk.content_hash, ResumeChunk.id), rid))
+    return {h: cid for h, cid in result.fetchall()}
+
+
+async def release_chunks(db: AsyncSession, rid: str):
+    """before deleting version `rid`: hand each chunk row it owns that another
+    version still links to over to that version, so the delete cascade only
+    removes rows nothing else uses"""
+    heir = (
+        select(func.min(ResumeChunkLink.resume_id))
+        .where(ResumeChunkLink.chunk_id == ResumeChunk.id,
+               ResumeChunkLink.resume_id != rid)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(ResumeChunk)
+        .where(ResumeChunk.resume_id == rid, heir.isnot(None))
+        .values(resume_id=heir)
+    )
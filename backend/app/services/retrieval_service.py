@@ -1,47 +1,344 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.models import ResumeChunk
+from sqlalchemy import select, func, desc, cast, literal, literal_column, Text
+from sqlalchemy.dialects.postgresql import TSQUERY
+from pgvector.sqlalchemy import avg
+from app.core.config import get_settings
+from app.core.vectors import cosine_distance
+from app.models import Resume, ResumeChunk, ResumeChunkLink, JobDescription, JDChunk
 from app.services.embedding_service import embed_one
+from app.services.resume_versions import chunks_of, chunk_idx, is_latest
+from app.services import vector_store
 
+cfg = get_settings()
 
-async def find_relevant_chunks(db: AsyncSession, rid: str, query: str, top_k: int = 5) -> list[dict]:
-    """vector similarity search against resume chunks"""
 
-    qvec = await embed_one(query)
+def _rows_to_chunks(rows) -> list[dict]:
+    return [
+        {
+            "id": r.id,
+            "content": r.content,
+            "section": r.section,
+            "index": r.idx,
+            "similarity": round(float(r.sim), 4),
+        }
+        for r in rows
+    ]
+
+
+async def jd_query_vector(db: AsyncSession, jd_id: str):
+    """mean-pooled vector of a jd's stored chunk embeddings, None if it has none"""
+    return await db.scalar(
+        select(avg(JDChunk.embedding)).where(JDChunk.jd_id == jd_id)
+    )
+
+
+async def _by_vector(db: AsyncSession, rid: str, qvec, top_k: int) -> list[dict]:
+    # same distance expression the ann index is built on
+    dist = cosine_distance(ResumeChunk.embedding, qvec)
+    stmt = (
+        chunks_of(select(
+            ResumeChunk.id,
+            ResumeChunk.content,
+            ResumeChunk.section,
+            chunk_idx,
+            (1 - dist).label('sim')
+        ), rid)
+        .order_by(dist)
+        .limit(top_k)
+    )
+
+    result = await db.execute(stmt)
+    # a relaxed_order iterative scan can hand rows back slightly out of order
+    rows = sorted(result.fetchall(), key=lambda r: r.sim, reverse=True)
+    return _rows_to_chunks(rows)
+
+
+async def _by_maxsim(db: AsyncSession, rid: str, jd_id: str, top_k: int) -> list[dict]:
+    """score each resume chunk by its best match among the jd's chunks"""
+    sim = func.max(1 - ResumeChunk.embedding.cosine_distance(JDChunk.embedding))
+    stmt = (
+        chunks_of(select(
+            ResumeChunk.id,
+            ResumeChunk.content,
+            ResumeChunk.section,
+            chunk_idx,
+            sim.label('sim')
+        ), rid)
+        .join(JDChunk, JDChunk.jd_id == jd_id)
+        .group_by(ResumeChunk.id, chunk_idx)
+        .order_by(desc('sim'))
+        .limit(top_k)
+    )
+
+    result = await db.execute(stmt)
+    return _rows_to_chunks(result.fetchall())
+
+
+def fts_document(content_col):
+    """tsvector expression; must match the gin index expression exactly"""
+    regconfig = literal_column(f"'{cfg.fts_config}'::regconfig")
+    return func.to_tsvector(regconfig, content_col)
+
+
+def _fts_any_query(text: str):
+    """tsquery matching chunks that share *any* term with text.
+
+    plainto_tsquery ANDs every word, which nothing matches for a whole jd,
+    so rewrite its & into |.
+    """
+    regconfig = literal_column(f"'{cfg.fts_config}'::regconfig")
+    anded = cast(func.plainto_tsquery(regconfig, text), Text)
+    return cast(func.replace(anded, ' & ', ' | '), TSQUERY)
+
+
+def _vector_ranks(rid: str, qvec, pool: int):
+    """(cte of the `pool` nearest chunks to qvec with their rank, sim expression)"""
+    dist = cosine_distance(ResumeChunk.embedding, qvec)
+    vec = (
+        chunks_of(select(ResumeChunk.id.label('id'),
+                         chunk_idx.label('idx'),
+                         func.row_number().over(order_by=dist).label('rnk')), rid)
+        .where(dist.isnot(None))
+        .order_by(dist)
+        .limit(pool)
+        .cte('vec')
+    )
+    return vec, 1 - dist
+
+
+def _maxsim_ranks(rid: str, jd_id: str, pool: int):
+    """same as _vector_ranks, chunks ranked by their best match among the
+    jd's chunks as in _by_maxsim"""
+    best = func.max(1 - ResumeChunk.embedding.cosine_distance(JDChunk.embedding))
+    vec = (
+        chunks_of(select(ResumeChunk.id.label('id'),
+                         chunk_idx.label('idx'),
+                         func.row_number().over(order_by=best.desc()).label('rnk')), rid)
+        .join(JDChunk, JDChunk.jd_id == jd_id)
+        .group_by(ResumeChunk.id, chunk_idx)
+        .order_by(best.desc())
+        .limit(pool)
+        .cte('vec')
+    )
+    sim = (
+        select(best)
+        .where(JDChunk.jd_id == jd_id)
+        .correlate(ResumeChunk)
+        .scalar_subquery()
+    )
+    return vec, sim
+
+
+async def _hybrid(db: AsyncSession, rid: str, query: str, top_k: int, jd_id: str = None) -> list[dict]:
+    """vector + full-text ranks fused with reciprocal rank fusion, one query.
+
+    score = wv / (k + vector_rank) + wl / (k + lexical_rank), a missing
+    rank contributes 0. with a jd_id the vector side follows
+    cfg.jd_query_mode like plain vector search: mean ranks by the mean jd
+    vector, maxsim by each chunk's best match among the jd's chunks.
+    """
+    pool = max(top_k, cfg.hybrid_candidates)
+    k = cfg.rrf_k
+
+    mode = cfg.jd_query_mode if jd_id else "text"
+    if mode == "maxsim":
+        # a jd without chunks just leaves the vector side empty
+        vec, sim = _maxsim_ranks(rid, jd_id, pool)
+    elif mode == "mean":
+        # mean jd vector as a subquery keeps this to a single round trip
+        qvec = (
+            select(avg(JDChunk.embedding))
+            .where(JDChunk.jd_id == jd_id)
+            .scalar_subquery()
+        )
+        vec, sim = _vector_ranks(rid, qvec, pool)
+    else:
+        vec, sim = _vector_ranks(rid, await embed_one(query), pool)
+
+    doc = fts_document(ResumeChunk.content)
+    tsq = _fts_any_query(query)
+    rank = func.ts_rank_cd(doc, tsq)
+    lex = (
+        chunks_of(select(ResumeChunk.id.label('id'),
+                         chunk_idx.label('idx'),
+                         func.row_number().over(order_by=rank.desc()).label('rnk')), rid)
+        .where(doc.op('@@')(tsq))
+        .order_by(rank.desc())
+        .limit(pool)
+        .cte('lex')
+    )
+
+    score = (
+        func.coalesce(literal(cfg.hybrid_vector_weight) / (k + vec.c.rnk), 0)
+        + func.coalesce(literal(cfg.hybrid_lexical_weight) / (k + lex.c.rnk), 0)
+    )
+    # fuse on position rather than chunk id: a repeated chunk is one row
+    # linked at two positions
+    fused = (
+        select(func.coalesce(vec.c.id, lex.c.id).label('id'),
+               func.coalesce(vec.c.idx, lex.c.idx).label('idx'),
+               score.label('score'))
+        .select_from(vec.join(lex, vec.c.idx == lex.c.idx, full=True))
+        .subquery('fused')
+    )
 
-    # Use SQLAlchemy ORM with pgvector's built-in distance method
     stmt = (
         select(
             ResumeChunk.id,
             ResumeChunk.content,
             ResumeChunk.section,
-            ResumeChunk.idx,
-            (1 - ResumeChunk.embedding.cosine_distance(qvec)).label('sim')
+            fused.c.idx,
+            func.coalesce(sim, 0).label('sim'),
+            fused.c.score,
         )
-        .where(ResumeChunk.resume_id == rid)
-        .order_by(ResumeChunk.embedding.cosine_distance(qvec))
+        .join(fused, fused.c.id == ResumeChunk.id)
+        .order_by(fused.c.score.desc())
         .limit(top_k)
     )
 
     result = await db.execute(stmt)
     rows = result.fetchall()
+    chunks = _rows_to_chunks(rows)
+    for ch, r in zip(chunks, rows):
+        ch["score"] = round(float(r.score), 6)
+    return chunks
+
+
+async def _find_in_memory(db: AsyncSession, rid: str, query: str, top_k: int, jd_id: str = None) -> list[dict]:
+    cm = await vector_store.resume_matrix(db, rid)
+    if cm is None:
+        return []
+
+    mode = cfg.jd_query_mode if jd_id else "text"
+    jd = await vector_store.jd_matrix(db, jd_id) if mode != "text" else None
+
+    if jd is not None and mode == "maxsim":
+        return vector_store.search_maxsim(cm, jd, top_k)
+    if jd is not None:
+        return vector_store.search(cm, vector_store.mean_query(jd), top_k)
+
+    qvec = vector_store.query_vector(await embed_one(query))
+    return vector_store.search(cm, qvec, top_k)
+
+
+async def find_relevant_chunks(
+    db: AsyncSession,
+    rid: str,
+    query: str,
+    top_k: int = 5,
+    jd_id: str = None,
+) -> list[dict]:
+    """vector (or hybrid vector + full-text) search against resume chunks
+
+    when jd_id is given the jd's stored chunk embeddings are used as the
+    query (cfg.jd_query_mode), so no embedding call is made. falls back to
+    embedding `query` if the jd has no chunks.
+    """
+
+    if cfg.retrieval_mode == "hybrid":
+        return await _hybrid(db, rid, query, top_k, jd_id)
+
+    if cfg.retrieval_backend == "memory":
+        try:
+            return await _find_in_memory(db, rid, query, top_k, jd_id)
+        except Exception as e:
+            print(f"In-memory retrieval failed, using pgvector: {e}")
+
+    mode = cfg.jd_query_mode if jd_id else "text"
+
+    if mode == "maxsim":
+        chunks = await _by_maxsim(db, rid, jd_id, top_k)
+        if chunks:
+            return chunks
+    elif mode == "mean":
+        qvec = await jd_query_vector(db, jd_id)
+        if qvec is not None:
+            return await _by_vector(db, rid, qvec, top_k)
+
+    qvec = await embed_one(query)
+    return await _by_vector(db, rid, qvec, top_k)
+
+
+async def rank_jds_for_resume(
+    db: AsyncSession,
+    rid: str,
+    jd_ids: list[str] = None,
+    limit: int = 50,
+) -> list[dict]:
+    """llm-free pre-score of many jds against one resume, in a single query.
 
+    score is the cosine similarity between the resume's and each jd's
+    mean-pooled chunk embeddings.
+    """
+    rvec = (
+        chunks_of(select(avg(ResumeChunk.embedding)), rid)
+        .scalar_subquery()
+    )
+    score = (1 - avg(JDChunk.embedding).cosine_distance(rvec)).label('score')
+
+    stmt = (
+        select(JobDescription.id, JobDescription.title,
+               JobDescription.company, score)
+        .join(JDChunk, JDChunk.jd_id == JobDescription.id)
+        .group_by(JobDescription.id)
+        .order_by(desc('score'))
+        .limit(limit)
+    )
+    if jd_ids:
+        stmt = stmt.where(JobDescription.id.in_(jd_ids))
+
+    result = await db.execute(stmt)
     return [
         {
-            "id": r.id,
-            "content": r.content,
-            "section": r.section,
-            "index": r.idx,
-            "similarity": round(float(r.sim), 4),
+            "jd_id": r.id,
+            "title": r.title,
+            "company": r.company,
+            "score": round(float(r.score), 4),
         }
-        for r in rows
+        for r in result.fetchall()
+        if r.score is not None
     ]
 
 
-def build_context(chunks: list[dict]) -> str:
-    """stitch chunks into a context string for the llm"""
-    parts = []
-    for ch in chunks:
-        label = ch.get("section", "general").upper()
-        parts.append(f"[{label}] {ch['content']}")
-    return "\n\n---\n\n".join(parts)
+async def rank_resumes_for_jd(
+    db: AsyncSession,
+    jd_id: str,
+    resume_ids: list[str] = None,
+    limit: int = 50,
+) -> list[dict]:
+    """same as rank_jds_for_resume, the other way round.
+
+    only the latest version of each resume is ranked unless resume_ids
+    names versions explicitly.
+    """
+    jvec = (
+        select(avg(JDChunk.embedding))
+        .where(JDChunk.jd_id == jd_id)
+        .scalar_subquery()
+    )
+    score = (1 - avg(ResumeChunk.embedding).cosine_distance(jvec)).label('score')
+
+    stmt = (
+        select(Resume.id, Resume.filename, score)
+        .join(ResumeChunkLink, ResumeChunkLink.resume_id == Resume.id)
+        .join(ResumeChunk, ResumeChunk.id == ResumeChunkLink.chunk_id)
+        .group_by(Resume.id)
+        .order_by(desc('score'))
+        .limit(limit)
+    )
+    if resume_ids:
+        stmt = stmt.where(Resume.id.in_(resume_ids))
+    else:
+        stmt = stmt.where(is_latest())
+
+    result = await db.execute(stmt)
+    return [
+        {
+            "resume_id": r.id,
+            "filename": r.filename,
+            "score": round(float(r.score), 4),
+        }
+        for r in result.fetchall()
+        if r.score is not None
+    ]
+
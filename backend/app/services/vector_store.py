@@ -0,0 +1,129 @@
+import numpy as np
+from dataclasses import dataclass
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.models import ResumeChunk, JDChunk
+from app.services.resume_versions import chunks_of, chunk_idx
+from app.utils.lru import LRUCache
+
+cfg = get_settings()
+
+
+@dataclass
+class ChunkMatrix:
+    """chunks of one resume/jd with their embeddings as one normalized float32 matrix"""
+    ids: list[str]
+    contents: list[str]
+    sections: list[str]
+    idxs: list[int]
+    mat: np.ndarray
+
+
+_resumes = LRUCache(maxsize=cfg.memory_index_size)
+_jds = LRUCache(maxsize=cfg.memory_index_size)
+
+
+def _normalize(mat: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(mat, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(mat / norms, dtype=np.float32)
+
+
+def _as_array(vec) -> np.ndarray:
+    # halfvec columns come back as pgvector HalfVector, vector ones as ndarray
+    if hasattr(vec, "to_numpy"):
+        vec = vec.to_numpy()
+    return np.asarray(vec, dtype=np.float32)
+
+
+def _to_matrix(rows, with_text: bool) -> ChunkMatrix:
+    mat = np.vstack([_as_array(r.embedding) for r in rows])
+    return ChunkMatrix(
+        ids=[r.id for r in rows],
+        contents=[r.content for r in rows] if with_text else [],
+        sections=[r.section for r in rows] if with_text else [],
+        idxs=[r.idx for r in rows] if with_text else [],
+        mat=_normalize(mat),
+    )
+
+
+async def resume_matrix(db: AsyncSession, rid: str) -> ChunkMatrix | None:
+    cached = _resumes.get(rid)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(
+        chunks_of(select(ResumeChunk.id, ResumeChunk.content, ResumeChunk.section,
+                         chunk_idx, ResumeChunk.embedding), rid)
+        .order_by(chunk_idx)
+    )
+    rows = result.fetchall()
+    if not rows:
+        return None
+
+    cm = _to_matrix(rows, with_text=True)
+    _resumes.set(rid, cm)
+    return cm
+
+
+async def jd_matrix(db: AsyncSession, jd_id: str) -> ChunkMatrix | None:
+    cached = _jds.get(jd_id)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(
+        select(JDChunk.id, JDChunk.embedding)
+        .where(JDChunk.jd_id == jd_id)
+        .order_by(JDChunk.idx)
+    )
+    rows = result.fetchall()
+    if not rows:
+        return None
+
+    cm = _to_matrix(rows, with_text=False)
+    _jds.set(jd_id, cm)
+    return cm
+
+
+def query_vector(vec) -> np.ndarray:
+    return _normalize(np.asarray(vec, dtype=np.float32))
+
+
+def mean_query(jd: ChunkMatrix) -> np.ndarray:
+    return query_vector(jd.mat.mean(axis=0))
+
+
+def top_k(cm: ChunkMatrix, sims: np.ndarray, k: int) -> list[dict]:
+    """best k rows by similarity; argpartition first so we only sort k items"""
+    k = min(k, len(sims))
+    if k <= 0:
+        return []
+    part = np.argpartition(-sims, k - 1)[:k]
+    order = part[np.argsort(-sims[part])]
+    return [
+        {
+            "id": cm.ids[i],
+            "content": cm.contents[i],
+            "section": cm.sections[i],
+            "index": cm.idxs[i],
+            "similarity": round(float(sims[i]), 4),
+        }
+        for i in order
+    ]
+
+
+def search(cm: ChunkMatrix, qvec: np.ndarray, k: int) -> list[dict]:
+    return top_k(cm, cm.mat @ qvec, k)
+
+
+def search_maxsim(cm: ChunkMatrix, jd: ChunkMatrix, k: int) -> list[dict]:
+    return top_k(cm, (cm.mat @ jd.mat.T).max(axis=1), k)
+
+
+def invalidate_resume(rid: str):
+    _resumes.pop(rid)
+
+
+def invalidate_jd(jd_id: str):
+    _jds.pop(jd_id)
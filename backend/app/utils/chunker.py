@@ -1,17 +1,100 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import re
+from collections import deque
+from functools import lru_cache
 from app.core.config import get_settings
+from app.utils.tokens import count_tokens
 
 cfg = get_settings()
 
+# same separators, in the same order, as the langchain splitter this replaces
+SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+
+@lru_cache(maxsize=None)
+def _pattern(sep: str) -> re.Pattern:
+    return re.compile(f"({re.escape(sep)})")
+
+
+def _split_keep_sep(text: str, sep: str) -> list[str]:
+    """split on sep, gluing each separator onto the start of the piece after it"""
+    if not sep:
+        return list(text)
+    parts = _pattern(sep).split(text)
+    out = [parts[0]] + [parts[i] + parts[i + 1]
+                        for i in range(1, len(parts) - 1, 2)]
+    return [p for p in out if p != ""]
+
+
+def _merge(splits: list[str], size: int, overlap: int, length) -> list[str]:
+    """pack small splits into chunks up to size, carrying up to overlap into the next"""
+    docs = []
+    current: deque[str] = deque()
+    lens: deque[int] = deque()
+    total = 0
+    for d in splits:
+        n = length(d)
+        if total + n > size and current:
+            doc = "".join(current).strip()
+            if doc:
+                docs.append(doc)
+            # drop from the front until what's left fits as overlap
+            while total > overlap or (total + n > size and total > 0):
+                total -= lens.popleft()
+                current.popleft()
+        current.append(d)
+        lens.append(n)
+        total += n
+    doc = "".join(current).strip()
+    if doc:
+        docs.append(doc)
+    return docs
+
+
+def _split(text: str, separators: list[str], size: int, overlap: int, length) -> list[str]:
+    sep = separators[-1]
+    rest = []
+    for i, s in enumerate(separators):
+        if s == "":
+            sep = s
+            break
+        if s in text:
+            sep = s
+            rest = separators[i + 1:]
+            break
+
+    out = []
+    good = []
+    for piece in _split_keep_sep(text, sep):
+        if length(piece) < size:
+            good.append(piece)
+            continue
+        if good:
+            out.extend(_merge(good, size, overlap, length))
+            good = []
+        if rest:
+            out.extend(_split(piece, rest, size, overlap, length))
+        else:
+            out.append(piece)
+    if good:
+        out.extend(_merge(good, size, overlap, length))
+    return out
+
 
 def chunk_text(txt: str, sz: int = None, overlap: int = None) -> list[str]:
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=sz or cfg.chunk_sz,
-        chunk_overlap=overlap or cfg.chunk_overlap,
-        separators=["\n\n", "\n", ". ", " ", ""],
-        length_function=len,
+    """recursive separator split with overlap.
+
+    output matches langchain's RecursiveCharacterTextSplitter (keep_separator
+    on, whitespace stripped) for the same separators/size/overlap. with
+    cfg.chunk_unit == "tokens", sz and overlap count tokens instead of chars.
+    """
+    length = count_tokens if cfg.chunk_unit == "tokens" else len
+    return _split(
+        txt,
+        SEPARATORS,
+        sz or cfg.chunk_sz,
+        overlap or cfg.chunk_overlap,
+        length,
     )
-    return splitter.split_text(txt)
 
 
 def chunk_by_section(sections: dict) -> list[dict]:
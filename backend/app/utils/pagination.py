@@ -0,0 +1,46 @@
+import base64
+from datetime import datetime
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# header carrying the next cursor on endpoints that return a bare list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(ts: datetime, row_id: str) -> str:
+    """opaque cursor for the last row of a page"""
+    raw = f"{ts.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """inverse of encode_cursor, raises ValueError on anything malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        ts, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(ts), row_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset(stmt, ts_col, id_col, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    """newest-first page of `stmt` after `cursor`, keyed on (ts_col, id_col).
+
+    fetches one extra row so page() can tell whether there's a next page.
+    the row comparison matches a (ts, id) btree index, scanned backwards.
+    """
+    stmt = stmt.order_by(ts_col.desc(), id_col.desc())
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(ts_col, id_col) < tuple_(ts, row_id))
+    return stmt.limit(limit + 1)
+
+
+def page(rows: list, limit: int, key) -> tuple[list, str | None]:
+    """trim the extra row keyset() fetched; key(row) -> (ts, id) of a row"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
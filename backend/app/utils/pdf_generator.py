@@ -69,6 +69,14 @@ def make_styles():
     }
 
 
+# built once per process; ParagraphStyles are only read while rendering
+STYLES = make_styles()
+
+BULLET_RE = re.compile(r'^[•\-\*\u2022]\s')
+BULLET_PREFIX_RE = re.compile(r'^[•\-\*\u2022]\s*')
+YEAR_RE = re.compile(r'\b(20\d{2}|19\d{2})\b')
+
+
 def clean(text: str) -> str:
     return (text
             .replace('&', '&amp;')
@@ -78,15 +86,15 @@ def clean(text: str) -> str:
 
 
 def is_bullet(line: str) -> bool:
-    return bool(re.match(r'^[•\-\*\u2022]\s', line.strip()))
+    return bool(BULLET_RE.match(line.strip()))
 
 
 def strip_bullet(line: str) -> str:
-    return re.sub(r'^[•\-\*\u2022]\s*', '', line.strip())
+    return BULLET_PREFIX_RE.sub('', line.strip())
 
 
 def is_job_header(line: str) -> bool:
-    return '–' in line or '—' in line or bool(re.search(r'\b(20\d{2}|19\d{2})\b', line))
+    return '–' in line or '—' in line or bool(YEAR_RE.search(line))
 
 
 def render_header(text: str, styles: dict, story: list):
@@ -106,13 +114,14 @@ def render_section(title: str, text: str, styles: dict, story: list):
         spaceBefore=4,
         spaceAfter=2,
     ))
-    story.append(Paragraph(title.upper(), styles['section_header']))
+    upper = title.upper()
+    story.append(Paragraph(upper, styles['section_header']))
 
     for line in text.split('\n'):
         stripped = line.strip()
         if not stripped:
             continue
-        if stripped.upper() in (title.upper(), title.upper() + ':'):
+        if stripped.upper() in (upper, upper + ':'):
             continue
         if is_bullet(stripped):
             story.append(
@@ -133,6 +142,8 @@ SECTION_TITLES = {
 
 
 def generate_resume_pdf(resume_data: dict | str, filename: str = "resume.pdf") -> bytes:
+    """render to pdf bytes. cpu-bound and synchronous; async callers go
+    through resume_tailoring_service.render_pdf"""
     buffer = BytesIO()
     doc = SimpleDocTemplate(
         buffer,
@@ -143,7 +154,7 @@ def generate_resume_pdf(resume_data: dict | str, filename: str = "resume.pdf") -
         bottomMargin=0.5 * inch,
     )
 
-    styles = make_styles()
+    styles = STYLES
     story = []
 
     if isinstance(resume_data, dict):
@@ -1,10 +1,15 @@
-import pdfplumber
 from io import BytesIO
 
 
-def extract_text(raw_bytes: bytes) -> str:
+def extract_text(raw_bytes: bytes, max_pages: int = None) -> str:
+    # imported here so the api process never loads pdfminer; parsing runs in workers
+    import pdfplumber
+
     parts = []
     with pdfplumber.open(BytesIO(raw_bytes)) as pdf:
+        if max_pages and len(pdf.pages) > max_pages:
+            raise ValueError(
+                f"PDF has {len(pdf.pages)} pages, {max_pages} max")
         for pg in pdf.pages:
             txt = pg.extract_text()
             if txt:
@@ -45,3 +50,9 @@ def split_into_sections(raw_text: str) -> dict:
         sections[current] = "\n".join(block).strip()
 
     return sections
+
+
+def parse_resume_pdf(raw_bytes: bytes, max_pages: int = None) -> tuple[str, dict]:
+    """text + sections in one go, so it can run as a single process-pool job"""
+    txt = extract_text(raw_bytes, max_pages)
+    return txt, split_into_sections(txt)
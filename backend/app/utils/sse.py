@@ -0,0 +1,13 @@
+import json
+
+# headers that stop proxies (nginx in particular) from buffering the stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data) -> str:
+    """format one server-sent event; data is json-encoded"""
+    payload = json.dumps(data)
+    return f"event: {event}\ndata: {payload}\n\n"
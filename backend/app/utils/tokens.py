@@ -0,0 +1,33 @@
+import math
+from functools import lru_cache
+from app.core.config import get_settings
+
+cfg = get_settings()
+
+
+@lru_cache()
+def _encoder():
+    """tiktoken encoding for the configured model, None if it can't be loaded.
+
+    gemini doesn't publish a tokenizer, o200k_base is close enough for budgeting.
+    """
+    try:
+        import tiktoken
+
+        if cfg.ai_provider == "openai":
+            try:
+                return tiktoken.encoding_for_model(cfg.openai_llm)
+            except KeyError:
+                pass
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # tiktoken downloads its bpe files on first use; don't fail over it
+        print(f"tiktoken unavailable, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    enc = _encoder()
+    if enc is None:
+        return math.ceil(len(text) / 4)
+    return len(enc.encode(text, disallowed_special=()))
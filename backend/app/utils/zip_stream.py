@@ -0,0 +1,37 @@
+import zipfile
+from typing import AsyncIterator
+
+
+class _Sink:
+    """write-only file object for zipfile. no tell/seek, so zipfile treats it
+    as unseekable and writes sizes in data descriptors after each entry"""
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def write(self, data) -> int:
+        self._buf += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        out = bytes(self._buf)
+        self._buf.clear()
+        return out
+
+
+async def stream_zip(files: AsyncIterator[tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    """zip (name, data) pairs as they arrive, yielding the archive in pieces.
+
+    only the entry being written is held in memory. entries are stored, not
+    deflated; the pdfs this serves are already compressed.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zf:
+        async for name, data in files:
+            zf.writestr(name, data)
+            yield sink.drain()
+    # central directory, written on close
+    yield sink.drain()
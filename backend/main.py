@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.database import init_db
 from app.core.config import get_settings
+from app.core.llm import close_llm
+from app.core.executors import shutdown_executors
 from app.api.resume_routes import router as resume_router
 from app.api.job_routes import router as job_router
 from app.api.generate_routes import router as generate_router
@@ -9,6 +11,10 @@ from app.api.analytics_routes import router as analytics_router
 from app.api.history_routes import router as history_router
 from app.api.applications_routes import router as applications_router
 from app.api.resume_tailoring_routes import router as tailoring_router
+from app.api.ingest_routes import router as ingest_router
+from app.api.internal_routes import router as internal_router
+from app.services.ingest_service import start_workers, stop_workers
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 
 cfg = get_settings()
@@ -21,6 +27,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # list endpoints return the next page's cursor in a header
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Routes
@@ -35,6 +43,14 @@ app.include_router(history_router, prefix="/api/history", tags=["history"])
 @app.on_event("startup")
 async def startup():
     await init_db()
+    await start_workers()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await stop_workers()
+    await close_llm()
+    shutdown_executors()
 
 
 @app.get("/")
@@ -46,3 +62,8 @@ app.include_router(applications_router,
                    prefix="/api/applications", tags=["applications"])
 
 app.include_router(tailoring_router, prefix="/api/tailor", tags=["tailoring"])
+
+app.include_router(ingest_router, prefix="/api/ingest", tags=["ingest"])
+
+app.include_router(internal_router, prefix="/internal",
+                   tags=["internal"], include_in_schema=False)
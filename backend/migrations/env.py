@@ -0,0 +1,80 @@
+"""alembic environment.
+
+two entry points: the alembic cli (builds its own engine from DATABASE_URL)
+and app.core.database.init_db, which passes the connection it is already
+holding in config.attributes["connection"] so startup migrations run inside
+the app's own transaction.
+
+the ann and full-text indexes on the chunk tables are created at boot by
+vectors.ensure_vector_indexes, from settings. include_object hides them from
+autogenerate so `alembic check` / `revision --autogenerate` don't drop them.
+"""
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import get_settings
+from app.core.database import Base
+from app.core.vectors import is_managed_index
+import app.models  # noqa: F401  registers the tables on Base.metadata
+
+cfg = get_settings()
+config = context.config
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    return not (type_ == "index" and is_managed_index(name))
+
+
+def run_migrations_offline() -> None:
+    """emit sql to stdout instead of running it (alembic upgrade --sql)"""
+    context.configure(
+        url=cfg.db_url,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    engine = create_async_engine(cfg.db_url, poolclass=pool.NullPool)
+
+    async with engine.connect() as conn:
+        await conn.run_sync(do_run_migrations)
+        await conn.commit()
+
+    await engine.dispose()
+
+
+connection = config.attributes.get("connection")
+
+if connection is not None:
+    do_run_migrations(connection)
+else:
+    # only the cli configures logging; inside the api we leave it alone
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name)
+    if context.is_offline_mode():
+        run_migrations_offline()
+    else:
+        asyncio.run(run_async_migrations())
@@ -0,0 +1,159 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+the tables as Base.metadata.create_all used to build them. databases created
+that way already have them, so each table is only created when missing and
+upgrading an existing install just records this revision.
+
+chunk embedding widths follow the configured provider (cfg.embed_dims), the
+same as the models.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+
+from app.core.config import get_settings
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+cfg = get_settings()
+
+
+def _id():
+    return sa.Column("id", sa.String(36), primary_key=True)
+
+
+def _created_at():
+    return sa.Column("created_at", sa.DateTime(), nullable=False)
+
+
+def _tables() -> list[tuple[str, list]]:
+    dims = cfg.embed_dims
+    return [
+        ("resumes", [
+            _id(),
+            sa.Column("filename", sa.String(255), nullable=False),
+            sa.Column("raw_text", sa.Text(), nullable=False),
+            sa.Column("parsed_data", sa.JSON(), nullable=True),
+            _created_at(),
+        ]),
+        ("resume_chunks", [
+            _id(),
+            sa.Column("resume_id", sa.String(36),
+                      sa.ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("idx", sa.Integer(), nullable=False),
+            sa.Column("section", sa.String(100), nullable=True),
+            sa.Column("embedding", pgvector.sqlalchemy.Vector(dims), nullable=True),
+        ]),
+        ("job_descriptions", [
+            _id(),
+            sa.Column("title", sa.String(255), nullable=False),
+            sa.Column("company", sa.String(255), nullable=True),
+            sa.Column("url", sa.String(500), nullable=True),
+            sa.Column("raw_text", sa.Text(), nullable=False),
+            sa.Column("extracted_skills", sa.JSON(), nullable=True),
+            sa.Column("extracted_reqs", sa.JSON(), nullable=True),
+            _created_at(),
+        ]),
+        ("jd_chunks", [
+            _id(),
+            sa.Column("jd_id", sa.String(36),
+                      sa.ForeignKey("job_descriptions.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("idx", sa.Integer(), nullable=False),
+            sa.Column("embedding", pgvector.sqlalchemy.Vector(dims), nullable=True),
+        ]),
+        ("match_analyses", [
+            _id(),
+            sa.Column("resume_id", sa.String(36),
+                      sa.ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("jd_id", sa.String(36),
+                      sa.ForeignKey("job_descriptions.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("score", sa.Float(), nullable=True),
+            sa.Column("matched", sa.JSON(), nullable=True),
+            sa.Column("missing", sa.JSON(), nullable=True),
+            sa.Column("notes", sa.Text(), nullable=True),
+            _created_at(),
+        ]),
+        ("generated_content", [
+            _id(),
+            sa.Column("resume_id", sa.String(36),
+                      sa.ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("jd_id", sa.String(36),
+                      sa.ForeignKey("job_descriptions.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("kind", sa.String(50), nullable=False),
+            sa.Column("body", sa.Text(), nullable=False),
+            sa.Column("meta", sa.JSON(), nullable=True),
+            _created_at(),
+        ]),
+        ("activity_logs", [
+            _id(),
+            sa.Column("action_type", sa.String(50), nullable=False),
+            sa.Column("resume_id", sa.String(36), nullable=True),
+            sa.Column("jd_id", sa.String(36), nullable=True),
+            sa.Column("metadata_json", sa.JSON(), nullable=True),
+            _created_at(),
+        ]),
+        ("applications", [
+            _id(),
+            sa.Column("resume_id", sa.String(36),
+                      sa.ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("jd_id", sa.String(36),
+                      sa.ForeignKey("job_descriptions.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("status", sa.String(50), nullable=False),
+            sa.Column("applied_date", sa.DateTime(), nullable=True),
+            sa.Column("interview_date", sa.DateTime(), nullable=True),
+            sa.Column("follow_up_date", sa.DateTime(), nullable=True),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.Column("contact_info", sa.JSON(), nullable=True),
+            _created_at(),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        ]),
+        ("embedding_cache", [
+            sa.Column("key", sa.String(64), primary_key=True),
+            sa.Column("provider", sa.String(20), nullable=False),
+            sa.Column("model", sa.String(100), nullable=False),
+            sa.Column("dims", sa.Integer(), nullable=False),
+            sa.Column("embedding", pgvector.sqlalchemy.Vector(), nullable=True),
+            _created_at(),
+        ]),
+        ("ingest_jobs", [
+            _id(),
+            sa.Column("kind", sa.String(20), nullable=False),
+            sa.Column("status", sa.String(20), nullable=False),
+            sa.Column("payload", sa.JSON(), nullable=True),
+            sa.Column("data", sa.LargeBinary(), nullable=True),
+            sa.Column("result_id", sa.String(36), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            _created_at(),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        ]),
+    ]
+
+
+def upgrade() -> None:
+    # pgvector needs this extension
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    if op.get_context().as_sql:
+        existing = set()
+    else:
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for name, cols in _tables():
+        if name not in existing:
+            op.create_table(name, *cols)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(_tables()):
+        op.drop_table(name, if_exists=True)
@@ -0,0 +1,48 @@
+"""secondary indexes for foreign keys and listing sort columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+listing endpoints sort newest-first on created_at (updated_at for
+applications); the trailing id keeps the order stable for keyset paging.
+ix_resume_chunks_resume_id / ix_jd_chunks_jd_id were previously created at
+boot by ensure_vector_indexes, hence if_not_exists throughout.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_resumes_created_at", "resumes", ["created_at", "id"]),
+    ("ix_resume_chunks_resume_id", "resume_chunks", ["resume_id"]),
+    ("ix_job_descriptions_created_at", "job_descriptions", ["created_at", "id"]),
+    ("ix_jd_chunks_jd_id", "jd_chunks", ["jd_id"]),
+    ("ix_match_analyses_resume_id", "match_analyses", ["resume_id"]),
+    ("ix_match_analyses_jd_id", "match_analyses", ["jd_id"]),
+    ("ix_generated_content_created_at", "generated_content", ["created_at", "id"]),
+    ("ix_generated_content_kind_created_at", "generated_content", ["kind", "created_at", "id"]),
+    ("ix_generated_content_pair", "generated_content", ["resume_id", "jd_id", "kind", "created_at"]),
+    ("ix_generated_content_jd_id", "generated_content", ["jd_id"]),
+    ("ix_activity_logs_created_at", "activity_logs", ["created_at", "id"]),
+    ("ix_applications_updated_at", "applications", ["updated_at", "id"]),
+    ("ix_applications_resume_id", "applications", ["resume_id"]),
+    ("ix_applications_jd_id", "applications", ["jd_id"]),
+    ("ix_ingest_jobs_status_created_at", "ingest_jobs", ["status", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, cols in INDEXES:
+        op.create_index(name, table, cols, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,87 @@
+"""resume versions and shared chunks
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+re-uploads of a resume become versions in a family (family_id is the first
+version's id). chunk rows are shared between versions through
+resume_chunk_links, matched on content_hash, so an edit only stores and
+embeds the chunks that changed.
+
+existing resumes become version 1 of their own family, and every existing
+chunk is linked to the resume that owns it at its own idx. idx was never
+unique per resume: where several chunks share one, the lowest chunk id is
+linked and the rest stay in resume_chunks unlinked (the upgrade logs which
+resumes that affects). the content_hash backfill must stay in step with
+resume_versions.content_hash.
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+log = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade() -> None:
+    op.add_column("resumes", sa.Column("family_id", sa.String(36), nullable=True))
+    op.add_column("resumes", sa.Column("version", sa.Integer(), nullable=True))
+    op.add_column("resumes", sa.Column("parent_id", sa.String(36), nullable=True))
+    op.create_foreign_key(
+        "resumes_parent_id_fkey", "resumes", "resumes",
+        ["parent_id"], ["id"], ondelete="SET NULL")
+    op.execute("UPDATE resumes SET family_id = id, version = 1")
+    op.alter_column("resumes", "family_id", nullable=False)
+    op.alter_column("resumes", "version", nullable=False)
+    op.create_index("ix_resumes_family_version", "resumes", ["family_id", "version"], unique=True)
+
+    op.add_column("resume_chunks", sa.Column("content_hash", sa.String(64), nullable=True))
+    op.execute(
+        "UPDATE resume_chunks SET content_hash = encode(sha256(convert_to("
+        "coalesce(section, '') || chr(31) || content, 'UTF8')), 'hex')"
+    )
+    op.alter_column("resume_chunks", "content_hash", nullable=False)
+
+    op.create_table(
+        "resume_chunk_links",
+        sa.Column("resume_id", sa.String(36),
+                  sa.ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("idx", sa.Integer(), primary_key=True),
+        sa.Column("chunk_id", sa.String(36),
+                  sa.ForeignKey("resume_chunks.id", ondelete="CASCADE"), nullable=False),
+    )
+    op.create_index("ix_resume_chunk_links_chunk_id", "resume_chunk_links", ["chunk_id"])
+    if not op.get_context().as_sql:
+        dupes = op.get_bind().execute(sa.text(
+            "SELECT resume_id, count(*) - count(DISTINCT idx) FROM resume_chunks "
+            "GROUP BY resume_id HAVING count(*) > count(DISTINCT idx)"
+        )).fetchall()
+        for rid, n in dupes:
+            log.warning("resume %s: %d chunk(s) share an idx with another chunk, "
+                        "left unlinked", rid, n)
+    op.execute(
+        "INSERT INTO resume_chunk_links (resume_id, idx, chunk_id) "
+        "SELECT DISTINCT ON (resume_id, idx) resume_id, idx, id FROM resume_chunks "
+        "ORDER BY resume_id, idx, id"
+    )
+
+
+def downgrade() -> None:
+    # chunks shared with a later version belong to whichever version stored
+    # them first; after downgrade the later version no longer sees them
+    op.drop_index("ix_resume_chunk_links_chunk_id", table_name="resume_chunk_links")
+    op.drop_table("resume_chunk_links")
+    op.drop_column("resume_chunks", "content_hash")
+    op.drop_index("ix_resumes_family_version", table_name="resumes")
+    op.drop_constraint("resumes_parent_id_fkey", "resumes", type_="foreignkey")
+    op.drop_column("resumes", "parent_id")
+    op.drop_column("resumes", "version")
+    op.drop_column("resumes", "family_id")
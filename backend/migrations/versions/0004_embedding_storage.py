@@ -0,0 +1,62 @@
+"""chunk embedding storage follows embed_storage / embed_truncate_dims
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+0001 creates chunk embeddings as float32 vector columns. from here on their
+precision (vector / halfvec) and width are settings, like the ann indexes:
+this converts existing columns to the configured type with the same ddl
+init_db runs on every boot (vectors.embedding_column_ddl), so a database
+upgraded from the cli matches the models before the app first starts, and
+boot keeps it in line when the settings change later.
+
+offline (--sql) mode can't see the current column types, so it emits nothing;
+the app converts on boot.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.vectors import (
+    CHUNK_TABLES, EMBEDDING_INDEXES_SQL, EMBEDDING_TYPE_SQL, PGVECTOR_VERSION_SQL,
+    embedding_column_ddl, parse_version)
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _column_types():
+    conn = op.get_bind()
+    for table, _ in CHUNK_TABLES:
+        have = conn.scalar(sa.text(EMBEDDING_TYPE_SQL), {"t": table})
+        indexes = [n for (n,) in conn.execute(
+            sa.text(EMBEDDING_INDEXES_SQL), {"t": table, "p": f"ix_{table}_embedding_%"})]
+        yield table, have, indexes
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        return
+    version = parse_version(op.get_bind().scalar(sa.text(PGVECTOR_VERSION_SQL)))
+    for table, have, indexes in _column_types():
+        for stmt in embedding_column_ddl(table, have, indexes, version):
+            op.execute(stmt)
+
+
+def downgrade() -> None:
+    # back to float32 at the current width; truncated dimensions can't be restored
+    if op.get_context().as_sql:
+        return
+    for table, have, indexes in _column_types():
+        if have and have.startswith("halfvec"):
+            dims = have[have.index("(") + 1:-1]
+            for name in indexes:
+                op.execute(f"DROP INDEX IF EXISTS {name}")
+            op.execute(
+                f"ALTER TABLE {table} ALTER COLUMN embedding TYPE vector({dims}) "
+                f"USING embedding::vector({dims})")
@@ -0,0 +1,89 @@
+"""time chunk row writes per chunk_insert_mode on a synthetic jd import.
+
+mirrors process_jd without the embedding call: per jd, insert the parent row,
+flush, then write its chunks with random unit vectors of cfg.embed_dims. each
+mode runs in its own transaction that is rolled back, so the database is left
+as it was. needs a migrated database at DATABASE_URL. run from backend/:
+
+    python -m scripts.bench_chunk_insert [--jds 1000] [--modes orm values copy]
+"""
+import argparse
+import asyncio
+import random
+import time
+import numpy as np
+from app.core.config import get_settings
+from app.core.database import engine, session_factory
+from app.models import JobDescription, JDChunk
+from app.services.chunk_store import insert_chunks
+from app.utils.chunker import chunk_text
+
+cfg = get_settings()
+
+WORDS = ("python go kubernetes grpc postgres requirements responsibilities "
+         "experience with distributed systems api design mentoring on-call "
+         "aws terraform ci/cd monitoring benefits equal opportunity").split()
+
+
+def _sample_jds(n: int, seed: int = 11) -> list[tuple[str, list[str], list[list[float]]]]:
+    """(raw_text, chunks, embeddings) per jd, built up front so only writes are timed"""
+    rnd = random.Random(seed)
+    np_rnd = np.random.default_rng(seed)
+    jds = []
+    for _ in range(n):
+        lines = [" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(6, 30))) + "."
+                 for _ in range(rnd.randint(10, 40))]
+        raw = "\n".join(lines)
+        chunks = chunk_text(raw)
+        vecs = np_rnd.standard_normal((len(chunks), cfg.embed_dims)).astype(np.float32)
+        vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+        jds.append((raw, chunks, vecs.tolist()))
+    return jds
+
+
+async def _run_mode(mode: str, jds) -> float:
+    async with session_factory() as db:
+        start = time.perf_counter()
+        for i, (raw, chunks, embeds) in enumerate(jds):
+            jd = JobDescription(title=f"bench {i}", raw_text=raw)
+            db.add(jd)
+            await db.flush()
+            await insert_chunks(db, JDChunk, [
+                {"jd_id": jd.id, "content": c, "idx": k, "embedding": e}
+                for k, (c, e) in enumerate(zip(chunks, embeds))
+            ], mode=mode)
+        await db.flush()
+        elapsed = time.perf_counter() - start
+        await db.rollback()
+    return elapsed
+
+
+async def main(args):
+    jds = _sample_jds(args.jds)
+    rows = sum(len(c) for _, c, _ in jds)
+    print(f"{args.jds} jds, {rows} chunk rows, {cfg.embed_dims} dims\n")
+
+    results = {}
+    for mode in args.modes:
+        # one warm-up jd so connection setup isn't billed to the first mode
+        await _run_mode(mode, jds[:1])
+        results[mode] = await _run_mode(mode, jds)
+        print(f"  {mode:<7} {results[mode]:7.2f}s  "
+              f"{rows / results[mode]:9.0f} rows/s  "
+              f"{1000 * results[mode] / args.jds:6.1f} ms/jd")
+
+    base = results.get("orm")
+    if base:
+        print()
+        for mode, t in results.items():
+            if mode != "orm":
+                print(f"  {mode} vs orm: {base / t:.1f}x")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jds", type=int, default=1000)
+    ap.add_argument("--modes", nargs="+", default=["orm", "values", "copy"])
+    asyncio.run(main(ap.parse_args()))
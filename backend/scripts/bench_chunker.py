@@ -0,0 +1,131 @@
+"""compare app.utils.chunker against langchain's RecursiveCharacterTextSplitter.
+
+checks the outputs are identical on a set of generated resume/jd-like texts
+(the golden check) and times both. run from backend/:
+
+    python -m scripts.bench_chunker [--runs 200]
+
+--golden rewrites the fixture tests/test_chunker.py checks against, from
+langchain's output on a fixed set of inputs:
+
+    python -m scripts.bench_chunker --golden tests/fixtures/chunker_golden.json
+
+langchain is only needed for the comparison (requirements-dev.txt), not by
+the app.
+"""
+import argparse
+import json
+import random
+import time
+from app.core.config import get_settings
+from app.utils.chunker import chunk_text, SEPARATORS
+
+cfg = get_settings()
+
+WORDS = ("python go kubernetes grpc postgres led built shipped reduced latency "
+         "by 40% team of 5 engineers designed distributed systems api "
+         "microservices aws terraform ci/cd monitoring").split()
+
+
+def _sample_texts(n: int, seed: int = 7) -> list[str]:
+    rnd = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        paras = []
+        for _ in range(rnd.randint(1, 8)):
+            lines = []
+            for _ in range(rnd.randint(1, 6)):
+                sentence = " ".join(rnd.choice(WORDS)
+                                    for _ in range(rnd.randint(3, 40)))
+                lines.append(("• " if rnd.random() < 0.4 else "") + sentence + ".")
+            paras.append(("\n" if rnd.random() < 0.7 else " ").join(lines))
+        # a few pathological inputs: no separators at all, or huge words
+        if rnd.random() < 0.05:
+            paras.append("x" * rnd.randint(600, 1500))
+        texts.append("\n\n".join(paras))
+    return texts
+
+
+# inputs the generated texts rarely hit
+EDGE_CASES = [
+    "",
+    "   \n\n  ",
+    "short line",
+    "x" * 1200,
+    "a. b. c. " * 80,
+    "\n".join(f"• bullet {i} " + "word " * 15 for i in range(30)),
+    "Ünïcödé résumé — naïve café. " * 40,
+    "para one\n\n\n\npara two\n\n" * 30,
+]
+
+# (chunk size, overlap) pairs in the golden fixture
+GOLDEN_SIZES = [(500, 50), (100, 20)]
+
+
+def _langchain_split(size: int = None, overlap: int = None):
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:
+        return None
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=size or cfg.chunk_sz,
+        chunk_overlap=overlap or cfg.chunk_overlap,
+        separators=SEPARATORS,
+        length_function=len,
+    )
+    return splitter.split_text
+
+
+def write_golden(path: str):
+    texts = EDGE_CASES + _sample_texts(4, seed=11)
+    cases = []
+    for size, overlap in GOLDEN_SIZES:
+        split = _langchain_split(size, overlap)
+        if split is None:
+            raise SystemExit("--golden needs langchain-text-splitters (requirements-dev.txt)")
+        cases += [{"size": size, "overlap": overlap, "text": t, "chunks": split(t)}
+                  for t in texts]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"cases": cases}, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    print(f"wrote {len(cases)} cases to {path}")
+
+
+def _time(fn, texts, runs) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        for t in texts:
+            fn(t)
+    return (time.perf_counter() - start) / (runs * len(texts)) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--texts", type=int, default=300)
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--golden", help="write the golden fixture for tests/test_chunker.py")
+    args = ap.parse_args()
+
+    if args.golden:
+        write_golden(args.golden)
+        return
+
+    texts = _sample_texts(args.texts)
+    reference = _langchain_split()
+
+    if reference is None:
+        print("langchain-text-splitters not installed, skipping golden check")
+    else:
+        bad = [i for i, t in enumerate(texts) if chunk_text(t) != reference(t)]
+        print(f"golden check: {len(texts) - len(bad)}/{len(texts)} identical")
+        if bad:
+            raise SystemExit(f"mismatched inputs: {bad[:10]}")
+
+    print(f"chunker:   {_time(chunk_text, texts, args.runs):8.1f} us/text")
+    if reference is not None:
+        # construct per call, like the old chunk_text did
+        print(f"langchain: {_time(lambda t: _langchain_split()(t), texts, args.runs):8.1f} us/text")
+
+
+if __name__ == "__main__":
+    main()
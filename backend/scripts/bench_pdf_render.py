@@ -0,0 +1,110 @@
+"""throughput of tailored resume pdf rendering with N concurrent exports.
+
+renders --resumes synthetic tailored resumes (structured dicts, as /finalize
+builds them) all at once, either inline on the event loop the way /finalize
+used to, or through render_pdf's process pool. while they run, a ticker
+coroutine measures how late the event loop wakes it; inline rendering stalls
+every other request for the whole batch. no database or llm needed. run
+from backend/:
+
+    python -m scripts.bench_pdf_render [--resumes 200] [--workers 1 2 4] [--modes inline pool]
+"""
+import argparse
+import asyncio
+import random
+import time
+from app.core.config import get_settings
+from app.core.executors import shutdown_executors
+from app.services.resume_tailoring_service import render_pdf
+from app.utils.pdf_generator import generate_resume_pdf, make_styles
+
+cfg = get_settings()
+
+WORDS = ("built scaled migrated led designed shipped python go kubernetes "
+         "postgres latency throughput api service pipeline team users "
+         "reduced improved automated monitoring 40% 3x").split()
+
+
+def _sample_resumes(n: int, seed: int = 7) -> list[dict]:
+    rnd = random.Random(seed)
+
+    def bullets(k):
+        return "\n".join("• " + " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(8, 20)))
+                         for _ in range(k))
+
+    resumes = []
+    for i in range(n):
+        jobs = "\n".join(
+            f"Engineer, Company {j} – 20{rnd.randint(10, 24)}\n{bullets(rnd.randint(3, 6))}"
+            for j in range(rnd.randint(2, 4)))
+        resumes.append({
+            "header": f"Candidate {i}\ncandidate{i}@example.com | 555-0100",
+            "education": "State University – 2018\nB.S. Computer Science",
+            "skills": ", ".join(rnd.sample(WORDS, 10)),
+            "experience": jobs,
+            "projects": bullets(rnd.randint(2, 5)),
+        })
+    return resumes
+
+
+async def _ticker(every_s: float, lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(every_s)
+        lags.append(time.perf_counter() - start - every_s)
+
+
+async def _inline(data: dict) -> bytes:
+    # what /finalize did: render synchronously inside the handler
+    return generate_resume_pdf(data, "bench.pdf")
+
+
+async def _pooled(data: dict) -> bytes:
+    return await render_pdf(data, "bench.pdf")
+
+
+async def _run(render, resumes: list[dict]) -> tuple[float, float]:
+    lags, stop = [], asyncio.Event()
+    ticker = asyncio.create_task(_ticker(0.01, lags, stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(render(r) for r in resumes))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    return elapsed, max(lags, default=0.0)
+
+
+def _styles_cost(n: int = 1000) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        make_styles()
+    return (time.perf_counter() - start) / n
+
+
+async def main(args):
+    # time rendering itself, not the on-disk pdf cache
+    cfg.pdf_cache_enabled = False
+    resumes = _sample_resumes(args.resumes)
+    print(f"{args.resumes} resumes rendered concurrently\n")
+    print(f"  make_styles per call (now once per process): {1e6 * _styles_cost():.0f}us\n")
+
+    for mode in args.modes:
+        for workers in (args.workers if mode == "pool" else [1]):
+            cfg.pdf_render_workers = workers
+            render = _pooled if mode == "pool" else _inline
+            # warm-up so worker spawn and reportlab import aren't timed
+            await _run(render, resumes[:workers])
+            elapsed, stall = await _run(render, resumes)
+            label = f"{mode} x{workers}" if mode == "pool" else mode
+            print(f"  {label:<9} {elapsed:7.2f}s  {args.resumes / elapsed:7.1f} pdf/s  "
+                  f"worst loop stall {1000 * stall:8.1f}ms")
+            shutdown_executors()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--resumes", type=int, default=200)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--modes", nargs="+", choices=["inline", "pool"], default=["inline", "pool"])
+    asyncio.run(main(ap.parse_args()))
@@ -0,0 +1,73 @@
+"""report import time of the api, per package and per module.
+
+runs `python -X importtime -c "import main"` in a fresh interpreter (several
+times, keeping the fastest) and summarises the result. run from backend/:
+
+    python -m scripts.bench_startup [--runs 5] [--top 20]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+def _import_once(target: str) -> tuple[float, list[tuple[str, int, int]]]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(__file__)),
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr[-2000:])
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = (p.strip() for p in line.split(":", 1)[1].split("|"))
+        rows.append((name, int(self_us), int(cum_us)))
+    return wall, rows
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--target", default="main")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=20)
+    args = ap.parse_args()
+
+    best_wall, best_rows = None, None
+    for _ in range(args.runs):
+        wall, rows = _import_once(args.target)
+        if best_wall is None or wall < best_wall:
+            best_wall, best_rows = wall, rows
+
+    by_pkg = defaultdict(int)
+    for name, self_us, _ in best_rows:
+        by_pkg[name.split(".")[0]] += self_us
+
+    total = sum(by_pkg.values())
+    print(f"import {args.target}: {total / 1000:.0f} ms in imports, "
+          f"{best_wall * 1000:.0f} ms process wall (best of {args.runs})\n")
+
+    print("per package (self time):")
+    for pkg, us in sorted(by_pkg.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {pkg}")
+
+    print("\nper module (cumulative):")
+    app_rows = [r for r in best_rows if r[0].startswith("app.") or r[0] == args.target]
+    for name, _, cum in sorted(app_rows, key=lambda r: -r[2])[:args.top]:
+        print(f"  {cum / 1000:8.1f} ms  {name}")
+
+    heavy = ["openai", "google.genai", "langchain", "langchain_text_splitters",
+             "pdfplumber", "reportlab", "tiktoken"]
+    loaded = {r[0] for r in best_rows}
+    print("\nheavy optional deps loaded at startup:",
+          ", ".join(m for m in heavy if m in loaded) or "none")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""create or rebuild the ann indexes on the chunk tables after a bulk load.
+
+boot skips an ivfflat index until the tables hold enough rows to train its
+lists, and never retrains one as data grows. run this once the data is in
+(and again after large imports) to build it regardless of size, or with
+--rebuild to reindex existing ann indexes on the current rows. run from
+backend/:
+
+    python -m scripts.build_vector_index [--rebuild]
+"""
+import argparse
+import asyncio
+from app.core.database import engine
+from app.core.vectors import ensure_vector_indexes, rebuild_vector_indexes
+
+
+async def main(args):
+    async with engine.begin() as conn:
+        if args.rebuild:
+            await rebuild_vector_indexes(conn)
+        await ensure_vector_indexes(conn, force=True)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rebuild", action="store_true",
+                    help="reindex existing ann indexes (retrains ivfflat centroids)")
+    asyncio.run(main(ap.parse_args()))
@@ -0,0 +1,119 @@
+"""recall of truncated / half-precision embeddings against full float32.
+
+works on a fixed evaluation set: a .npz snapshot with `corpus` (resume chunk
+embeddings) and `queries` (jd chunk embeddings), both at the model's full
+size. ground truth is exact cosine top-k at full size and float32; every
+(dims, precision) combination is scored by recall@k against it, the same
+truncate + renormalize the app applies with embed_truncate_dims.
+
+take the snapshot once, from a database still at full dims, then rerun the
+eval on the same file whenever settings change. run from backend/:
+
+    python -m scripts.eval_embedding_recall --dump eval_set.npz [--corpus 20000 --queries 500]
+    python -m scripts.eval_embedding_recall --snapshot eval_set.npz [--dims 1536 768 256] [--k 5 10]
+"""
+import argparse
+import asyncio
+import numpy as np
+from sqlalchemy import func, select
+from app.core.config import get_settings
+
+cfg = get_settings()
+
+PRECISIONS = {
+    "float32": np.float32,
+    "float16": np.float16,
+}
+
+
+def _as_array(vec) -> np.ndarray:
+    if hasattr(vec, "to_numpy"):
+        vec = vec.to_numpy()
+    return np.asarray(vec, dtype=np.float32)
+
+
+async def dump(path: str, n_corpus: int, n_queries: int):
+    from app.core.database import engine, session_factory
+    from app.models import ResumeChunk, JDChunk
+
+    async with session_factory() as db:
+        corpus = (await db.execute(
+            select(ResumeChunk.embedding).order_by(func.md5(ResumeChunk.id)).limit(n_corpus)
+        )).scalars().all()
+        queries = (await db.execute(
+            select(JDChunk.embedding).order_by(func.md5(JDChunk.id)).limit(n_queries)
+        )).scalars().all()
+    await engine.dispose()
+
+    if not corpus or not queries:
+        raise SystemExit("need both resume and jd chunks in the database")
+    np.savez_compressed(
+        path,
+        corpus=np.vstack([_as_array(v) for v in corpus]),
+        queries=np.vstack([_as_array(v) for v in queries]),
+    )
+    print(f"saved {len(corpus)} corpus / {len(queries)} query vectors "
+          f"({len(_as_array(corpus[0]))} dims) to {path}")
+
+
+def _prepare(mat: np.ndarray, dims: int, dtype) -> np.ndarray:
+    """truncate, renormalize, round-trip through the storage precision"""
+    out = mat[:, :dims].astype(np.float32)
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (out / norms).astype(dtype).astype(np.float32)
+
+
+def _top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> np.ndarray:
+    sims = queries @ corpus.T
+    part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    return part
+
+
+def _recall(truth: np.ndarray, got: np.ndarray) -> float:
+    hits = sum(len(set(t) & set(g)) for t, g in zip(truth, got))
+    return hits / truth.size
+
+
+def evaluate(path: str, dims_list: list[int], ks: list[int]):
+    data = np.load(path)
+    corpus, queries = data["corpus"], data["queries"]
+    full = corpus.shape[1]
+    print(f"{len(corpus)} corpus / {len(queries)} queries, {full} dims\n")
+
+    base_c = _prepare(corpus, full, np.float32)
+    base_q = _prepare(queries, full, np.float32)
+    truth = {k: _top_k(base_q, base_c, k) for k in ks}
+
+    header = "  ".join(f"recall@{k:<3}" for k in ks)
+    print(f"  {'dims':>5}  {'precision':<9}  {'bytes/vec':>9}  {header}")
+    for dims in sorted({d for d in dims_list if d <= full} | {full}, reverse=True):
+        for name, dtype in PRECISIONS.items():
+            c = _prepare(corpus, dims, dtype)
+            q = _prepare(queries, dims, dtype)
+            row = "  ".join(
+                f"{_recall(truth[k], _top_k(q, c, k)):<10.4f}" for k in ks)
+            nbytes = dims * np.dtype(dtype).itemsize + 8
+            print(f"  {dims:>5}  {name:<9}  {nbytes:>9}  {row}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dump", help="write an evaluation snapshot from the database")
+    ap.add_argument("--corpus", type=int, default=20000)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--snapshot", help="evaluate on this snapshot")
+    ap.add_argument("--dims", type=int, nargs="+", default=[1536, 1024, 768, 512, 256])
+    ap.add_argument("--k", type=int, nargs="+", default=[5, 10])
+    args = ap.parse_args()
+
+    if args.dump:
+        asyncio.run(dump(args.dump, args.corpus, args.queries))
+    elif args.snapshot:
+        evaluate(args.snapshot, args.dims, args.k)
+    else:
+        ap.error("pass --dump or --snapshot")
+
+
+if __name__ == "__main__":
+    main()
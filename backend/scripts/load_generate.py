@@ -0,0 +1,119 @@
+"""concurrent generation load against a running api, watching db pool occupancy.
+
+fires --concurrency requests at a generate endpoint (--total in all) while
+polling /internal/db-pool, then reports latency and peak pool usage. with
+short db phases, checked_out should stay well under --concurrency because
+no connection is held during the llm call. run from backend/:
+
+    python -m scripts.load_generate --resume-id R --jd-id J \\
+        [--url http://localhost:8000] [--endpoint match] [--concurrency 20] [--total 60]
+
+pass --force-refresh (the default) so the result cache doesn't short-circuit
+the llm call when gen_cache_enabled is on.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+ENDPOINTS = {
+    "match": "/api/generate/match",
+    "cover-letter": "/api/generate/cover-letter",
+    "interview-prep": "/api/generate/interview-prep",
+    "tailor": "/api/tailor/suggest",
+}
+
+
+async def _poll_pool(http: httpx.AsyncClient, every_s: float, samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            resp = await http.get("/internal/db-pool")
+            samples.append(resp.json())
+        except httpx.HTTPError as e:
+            print(f"pool poll failed: {e}")
+        try:
+            await asyncio.wait_for(stop.wait(), every_s)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _fire(http: httpx.AsyncClient, path: str, body: dict, sem: asyncio.Semaphore, results: list):
+    async with sem:
+        start = time.perf_counter()
+        try:
+            resp = await http.post(path, json=body)
+            status = resp.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        results.append((status, time.perf_counter() - start))
+
+
+def _pct(vals: list[float], q: float) -> float:
+    if not vals:
+        return 0.0
+    vals = sorted(vals)
+    return vals[min(len(vals) - 1, int(q * len(vals)))]
+
+
+async def run(args):
+    body = {"resume_id": args.resume_id, "jd_id": args.jd_id}
+    if args.endpoint != "tailor":
+        body["force_refresh"] = args.force_refresh
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as http:
+        await http.post("/internal/db-pool/reset")
+
+        samples, results = [], []
+        stop = asyncio.Event()
+        poller = asyncio.create_task(_poll_pool(http, args.poll_s, samples, stop))
+
+        sem = asyncio.Semaphore(args.concurrency)
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _fire(http, ENDPOINTS[args.endpoint], body, sem, results)
+            for _ in range(args.total)))
+        wall = time.perf_counter() - start
+
+        stop.set()
+        await poller
+        final = (await http.get("/internal/db-pool")).json()
+
+    lat = [t for _, t in results]
+    codes = {}
+    for status, _ in results:
+        codes[status] = codes.get(status, 0) + 1
+
+    print(f"{args.total} x {args.endpoint} at concurrency {args.concurrency}: "
+          f"{wall:.1f}s wall, {args.total / wall:.2f} req/s")
+    print(f"  status: {codes}")
+    print(f"  latency: mean {statistics.mean(lat):.2f}s  p50 {_pct(lat, 0.5):.2f}s  "
+          f"p95 {_pct(lat, 0.95):.2f}s  max {max(lat):.2f}s")
+
+    if samples:
+        busy = [s["checked_out"] for s in samples]
+        print(f"\npool (size {final['size']} + overflow {final['max_overflow']}), "
+              f"{len(samples)} samples every {args.poll_s}s:")
+        print(f"  checked_out: peak {max(busy)}  mean {statistics.mean(busy):.1f}")
+        print(f"  overflow peak: {max(s['overflow'] for s in samples)}")
+    print(f"  checkouts {final['checkouts']}  waited {final['waited']}  "
+          f"timeouts {final['timeouts']}  wait avg {final['wait_avg_ms']}ms  "
+          f"max {final['wait_max_ms']}ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://localhost:8000")
+    ap.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="match")
+    ap.add_argument("--resume-id", required=True)
+    ap.add_argument("--jd-id", required=True)
+    ap.add_argument("--concurrency", type=int, default=20)
+    ap.add_argument("--total", type=int, default=60)
+    ap.add_argument("--poll-s", type=float, default=0.1)
+    ap.add_argument("--timeout", type=float, default=120)
+    ap.add_argument("--force-refresh", action=argparse.BooleanOptionalAction, default=True)
+    asyncio.run(run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+
+# tests that need postgres point the app at a scratch database. this has to
+# happen before app.core.config is imported, settings are read once
+if os.environ.get("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
@@ -0,0 +1,38 @@
+"""chunk boundaries match langchain's RecursiveCharacterTextSplitter, which
+chunk_text replaced. chunks already stored were cut by it, and content_hash
+matching across resume versions depends on cutting the same way.
+
+the expected chunks are langchain's, committed as a fixture so langchain
+isn't needed to run this. regenerate with scripts/bench_chunker --golden.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from app.core.config import get_settings
+from app.utils.chunker import chunk_text
+
+GOLDEN = Path(__file__).parent / "fixtures" / "chunker_golden.json"
+CASES = json.loads(GOLDEN.read_text(encoding="utf-8"))["cases"]
+
+
+@pytest.fixture(autouse=True)
+def _chars(monkeypatch):
+    # the fixture counts characters
+    monkeypatch.setattr(get_settings(), "chunk_unit", "chars")
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda c: f"{c['size']}-{len(c['text'])}")
+def test_matches_golden(case):
+    assert chunk_text(case["text"], case["size"], case["overlap"]) == case["chunks"]
+
+
+def test_matches_langchain_on_generated_texts():
+    pytest.importorskip("langchain_text_splitters")
+    from scripts.bench_chunker import _langchain_split, _sample_texts
+
+    for size, overlap in [(500, 50), (100, 20)]:
+        split = _langchain_split(size, overlap)
+        for text in _sample_texts(100, seed=3):
+            assert chunk_text(text, size, overlap) == split(text)
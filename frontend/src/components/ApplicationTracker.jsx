@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import { Plus, Calendar, Trash2, Edit2, Check, X } from 'lucide-react';
+import { fetchAllPages } from '../services/api';
 
 export default function ApplicationTracker({ darkMode, resumes, jobs }) {
   const [applications, setApplications] = useState([]);
@@ -23,9 +24,10 @@ export default function ApplicationTracker({ darkMode, resumes, jobs }) {
 
   const loadApplications = async () => {
     try {
-      const resp = await fetch('http://localhost:8000/api/applications/');
-      const data = await resp.json();
-      setApplications(data.applications);
+      setApplications(await fetchAllPages(
+        'http://localhost:8000/api/applications/?include_body=true',
+        (data) => data.applications
+      ));
     } catch (err) {
       console.error('Failed to load applications:', err);
     } finally {
@@ -14,8 +14,8 @@ export default function HistoryTab({ darkMode }) {
     setLoading(true);
     try {
       const url = filter === 'all' 
-        ? 'http://localhost:8000/api/history/' 
-        : `http://localhost:8000/api/history/?content_type=${filter}`;
+        ? 'http://localhost:8000/api/history/?include_body=true' 
+        : `http://localhost:8000/api/history/?include_body=true&content_type=${filter}`;
       
       const resp = await fetch(url);
       const data = await resp.json();
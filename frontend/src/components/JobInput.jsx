@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import { Briefcase, Trash2, Loader2, Sparkles, Plus } from 'lucide-react';
+import { fetchAllPages } from '../services/api';
 
 const styles = `
   .ji-wrap { display: flex; flex-direction: column; gap: 12px; }
@@ -165,9 +166,7 @@ export default function JobInput({ onDone }) {
 
   const loadJobs = async () => {
     try {
-      const resp = await fetch('http://localhost:8000/api/jobs/');
-      const data = await resp.json();
-      setJobs(data);
+      setJobs(await fetchAllPages('http://localhost:8000/api/jobs/'));
     } catch (err) { console.error('Failed to load jobs:', err); }
   };
 
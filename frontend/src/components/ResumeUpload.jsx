@@ -1,5 +1,6 @@
 import { useState, useEffect, useRef } from 'react';
 import { Upload, Trash2, FileText, Loader2, Plus } from 'lucide-react';
+import { fetchAllPages } from '../services/api';
 
 const styles = `
   .ru-wrap { display: flex; flex-direction: column; gap: 12px; }
@@ -139,9 +140,7 @@ export default function ResumeUpload({ onDone }) {
 
   const loadResumes = async () => {
     try {
-      const resp = await fetch('http://localhost:8000/api/resumes/');
-      const data = await resp.json();
-      setResumes(data);
+      setResumes(await fetchAllPages('http://localhost:8000/api/resumes/'));
     } catch (err) { console.error('Failed to load resumes:', err); }
   };
 
@@ -5,6 +5,41 @@ const api = axios.create({
   headers: { 'Content-Type': 'application/json' },
 });
 
+// list endpoints are paged (newest first, at most 200 per page); these follow
+// the cursor to the last page. bare-list endpoints send it in the
+// X-Next-Cursor header, the others as next_cursor in the body
+const PAGE_SIZE = 200;
+
+const getAllPages = async (path, itemsOf = (data) => data) => {
+  const items = [];
+  let cursor = null;
+  do {
+    const { data, headers } = await api.get(path, {
+      params: cursor ? { limit: PAGE_SIZE, cursor } : { limit: PAGE_SIZE },
+    });
+    items.push(...itemsOf(data));
+    cursor = headers['x-next-cursor'] || data.next_cursor || null;
+  } while (cursor);
+  return items;
+};
+
+// same as getAllPages, for components calling the api with fetch and a full url
+export const fetchAllPages = async (url, itemsOf = (data) => data) => {
+  const items = [];
+  let cursor = null;
+  do {
+    const page = new URL(url);
+    page.searchParams.set('limit', PAGE_SIZE);
+    if (cursor) page.searchParams.set('cursor', cursor);
+    const resp = await fetch(page);
+    if (!resp.ok) throw new Error(`${resp.status} ${resp.statusText}`);
+    const data = await resp.json();
+    items.push(...itemsOf(data));
+    cursor = resp.headers.get('X-Next-Cursor') || data.next_cursor || null;
+  } while (cursor);
+  return items;
+};
+
 // resumes
 export const uploadResume = async (file) => {
   const form = new FormData();
@@ -15,10 +50,7 @@ export const uploadResume = async (file) => {
   return data;
 };
 
-export const getResumes = async () => {
-  const { data } = await api.get('/resumes/');
-  return data;
-};
+export const getResumes = () => getAllPages('/resumes/');
 
 export const getResume = async (id) => {
   const { data } = await api.get(`/resumes/${id}`);
@@ -31,10 +63,7 @@ export const createJD = async (payload) => {
   return data;
 };
 
-export const getJDs = async () => {
-  const { data } = await api.get('/jobs/');
-  return data;
-};
+export const getJDs = () => getAllPages('/jobs/');
 
 // generation
 export const runMatch = async (payload) => {